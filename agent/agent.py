@@ -1,247 +1,417 @@
-import json
 import logging
 import asyncio
-from typing import Dict, List, Any, Optional, Callable, Awaitable
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional
 import aiohttp
+from cachetools import TTLCache
+import fastjsonschema
+import orjson
 import re
 from datetime import datetime, timedelta
 
 from agent.tools import FederalRegistryTools
 from config import OLLAMA_BASE_URL, OLLAMA_MODEL
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger('agent')
 
+# Fenced ```json blocks the model uses to emit tool calls
+_JSON_BLOCK_RE = re.compile(r'```json\s*([\s\S]*?)\s*```')
+
+# Maximum number of cached (message, context) -> response entries
+RESPONSE_CACHE_MAXSIZE = 256
+
+# Seconds a cached response is reused; answers depend on the data and the date
+RESPONSE_CACHE_TTL = 300
+
+# Seconds allowed to connect to Ollama, and to wait between streamed chunks. There is
+# no total limit: a stalled stream is caught by the read timeout, a long answer is not
+# cut off. The first chunk can take a while on CPU while the prompt is evaluated.
+OLLAMA_CONNECT_TIMEOUT = 30
+OLLAMA_READ_TIMEOUT = 300
+
+# Returned to the user when a turn fails
+ERROR_RESPONSE = "I'm sorry, but I encountered an error while processing your request. Please try again later."
+
+# Fields kept when documents are handed back to the model; summary rows have no abstract
+_DOC_KEYS = ('id', 'document_number', 'document_type', 'title', 'publication_date', 'abstract')
+
+# Presidential document info, only included when set
+_PRESIDENTIAL_DOC_KEYS = ('presidential_document_type', 'executive_order_number')
+
+# Related names, included whenever present
+_RELATION_KEYS = ('agencies', 'topics')
+
+# Number of recent user/assistant turns sent verbatim to the model
+MAX_HISTORY_TURNS = 8
+
+# Conversations kept in memory, and seconds of inactivity after which one is dropped
+CHAT_HISTORY_MAXSIZE = 1024
+CHAT_HISTORY_TTL = 3600
+
+# Turns allowed past the window before it is compacted back down, so the
+# summarization call runs once every few turns rather than on every turn
+HISTORY_COMPACT_SLACK_TURNS = 4
+
+# Older turns are folded into a single system message with this prefix
+SUMMARY_PREFIX = "Summary of earlier conversation: "
+
+# Per-message cap when building the transcript to summarize
+SUMMARY_MESSAGE_CHARS = 500
+
+# Static part of the system prompt; only the date suffix changes
+SYSTEM_PROMPT = """You are a helpful assistant that can access and search through the Federal Registry database.
+Your goal is to help users find information about federal documents, executive orders, rules, and notices.
+
+You have access to the following tools:
+1. search_documents - Search for documents with various filters
+   Parameters: keywords, date_from, date_to, document_type, agency, topic, presidential_doc_type, executive_order, limit, offset
+2. get_recent_documents - Get the most recent documents
+   Parameters: limit
+3. get_document_by_id - Get a specific document by ID
+   Parameters: document_id
+4. get_document_types - Get all document types
+5. get_agencies - Get all agencies
+6. get_topics - Get all topics
+7. get_presidential_document_types - Get all presidential document types
+8. search_recent_executive_orders - Search for recent executive orders
+   Parameters: days, limit
+9. search_documents_by_date_range - Search documents within a date range
+   Parameters: start_date, end_date, limit
+10. search_by_agency_and_topic - Search documents by agency and topic
+    Parameters: agency, topic, limit
+
+To use a tool, format your tool call as follows:
+```json
+{
+    "name": "tool_name",
+    "parameters": {
+        "param1": "value1",
+        "param2": "value2"
+    }
+}
+```
+
+Examples:
+1. To search documents from a specific date:
+```json
+{
+    "name": "search_documents",
+    "parameters": {
+        "date_from": "2025-01-01",
+        "date_to": "2025-01-31"
+    }
+}
+```
+
+2. To search recent executive orders:
+```json
+{
+    "name": "search_recent_executive_orders",
+    "parameters": {
+        "days": 30,
+        "limit": 10
+    }
+}
+```
+
+Always use these exact tool names and parameters. Do not invent new tool names.
+"""
+
+def _coerce_scalar(value, schema_type):
+    """
+    Convert a scalar to the schema type when it unambiguously represents it.
+    
+    Small models often quote numbers or send numbers for string fields; the
+    database accepted both before validation, so they are converted rather
+    than rejected. Values that can't be converted are returned unchanged.
+    
+    Args:
+        value: Parameter value from the model
+        schema_type: JSON schema type of the parameter
+        
+    Returns:
+        Converted value, or the original value
+    """
+    if isinstance(value, bool):
+        return value
+    if schema_type == "integer":
+        if isinstance(value, str):
+            try:
+                return int(value.strip())
+            except ValueError:
+                return value
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+    elif schema_type == "string" and isinstance(value, (int, float)):
+        return str(value)
+    return value
+
+@dataclass(slots=True)
+class AgentReply:
+    """The agent's answer to one message."""
+    text: str
+    error: bool = False
+
 class OllamaAgent:
     """Agent that uses Ollama for LLM inference and tools for information retrieval."""
     
-    def __init__(self):
-        self.tools = FederalRegistryTools()
-        self.ollama_base_url = OLLAMA_BASE_URL
-        self.model = OLLAMA_MODEL
-        self.chat_history = []
-        
-        # Register tools
-        self.available_tools = {
-            "search_documents": self.tools.search_documents,
-            "get_recent_documents": self.tools.get_recent_documents,
-            "get_document_by_id": self.tools.get_document_by_id,
-            "get_document_types": self.tools.get_document_types,
-            "get_agencies": self.tools.get_agencies,
-            "get_topics": self.tools.get_topics,
-            "get_presidential_document_types": self.tools.get_presidential_document_types,
-            "search_recent_executive_orders": self.tools.search_recent_executive_orders,
-            "search_documents_by_date_range": self.tools.search_documents_by_date_range,
-            "search_by_agency_and_topic": self.tools.search_by_agency_and_topic
-        }
-        
-        # Tool descriptions for the model
-        self.tool_descriptions = [
-            {
-                "name": "search_documents",
-                "description": "Search for documents in the Federal Registry database based on various criteria",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "keywords": {
-                            "type": "string",
-                            "description": "Search terms to look for in title and abstract"
-                        },
-                        "date_from": {
-                            "type": "string",
-                            "description": "Start date for publication_date filter (YYYY-MM-DD)"
-                        },
-                        "date_to": {
-                            "type": "string",
-                            "description": "End date for publication_date filter (YYYY-MM-DD)"
-                        },
-                        "document_type": {
-                            "type": "string",
-                            "description": "Filter by document type"
-                        },
-                        "agency": {
-                            "type": "string",
-                            "description": "Filter by agency name"
-                        },
-                        "topic": {
-                            "type": "string",
-                            "description": "Filter by topic name"
-                        },
-                        "presidential_doc_type": {
-                            "type": "string",
-                            "description": "Filter by presidential document type"
-                        },
-                        "executive_order": {
-                            "type": "string",
-                            "description": "Filter by executive order number"
-                        },
-                        "limit": {
-                            "type": "integer",
-                            "description": "Maximum number of results to return"
-                        },
-                        "offset": {
-                            "type": "integer",
-                            "description": "Offset for pagination"
-                        }
+    __slots__ = (
+        'tools',
+        'ollama_base_url',
+        'model',
+        'chat_history',
+        '_session',
+        '_exact_cache',
+        '_system_message_cached'
+    )
+    
+    # Tool descriptions for the model
+    TOOL_DESCRIPTIONS = [
+        {
+            "name": "search_documents",
+            "description": "Search for documents in the Federal Registry database based on various criteria",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "keywords": {
+                        "type": "string",
+                        "description": "Search terms to look for in title and abstract"
                     },
-                    "required": []
-                }
-            },
-            {
-                "name": "get_recent_documents",
-                "description": "Get the most recent documents in the Federal Registry",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "limit": {
-                            "type": "integer",
-                            "description": "Maximum number of documents to return"
-                        }
+                    "date_from": {
+                        "type": "string",
+                        "description": "Start date for publication_date filter (YYYY-MM-DD)"
                     },
-                    "required": []
-                }
-            },
-            {
-                "name": "get_document_by_id",
-                "description": "Get a document by its ID",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "document_id": {
-                            "type": "integer",
-                            "description": "The document ID"
-                        }
+                    "date_to": {
+                        "type": "string",
+                        "description": "End date for publication_date filter (YYYY-MM-DD)"
                     },
-                    "required": ["document_id"]
-                }
-            },
-            {
-                "name": "get_document_types",
-                "description": "Get all document types in the database",
-                "parameters": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            },
-            {
-                "name": "get_agencies",
-                "description": "Get all agencies in the database",
-                "parameters": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            },
-            {
-                "name": "get_topics",
-                "description": "Get all topics in the database",
-                "parameters": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            },
-            {
-                "name": "get_presidential_document_types",
-                "description": "Get all presidential document types in the database",
-                "parameters": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            },
-            {
-                "name": "search_recent_executive_orders",
-                "description": "Search for recent executive orders",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "days": {
-                            "type": "integer",
-                            "description": "Number of days in the past to search"
-                        },
-                        "limit": {
-                            "type": "integer",
-                            "description": "Maximum number of results to return"
-                        }
+                    "document_type": {
+                        "type": "string",
+                        "description": "Filter by document type"
                     },
-                    "required": []
-                }
-            },
-            {
-                "name": "search_documents_by_date_range",
-                "description": "Search for documents within a date range",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "start_date": {
-                            "type": "string",
-                            "description": "Start date (YYYY-MM-DD)"
-                        },
-                        "end_date": {
-                            "type": "string",
-                            "description": "End date (YYYY-MM-DD)"
-                        },
-                        "limit": {
-                            "type": "integer",
-                            "description": "Maximum number of results to return"
-                        }
+                    "agency": {
+                        "type": "string",
+                        "description": "Filter by agency name"
                     },
-                    "required": ["start_date", "end_date"]
-                }
-            },
-            {
-                "name": "search_by_agency_and_topic",
-                "description": "Search for documents by agency and topic",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "agency": {
-                            "type": "string",
-                            "description": "Agency name"
-                        },
-                        "topic": {
-                            "type": "string",
-                            "description": "Topic name"
-                        },
-                        "limit": {
-                            "type": "integer",
-                            "description": "Maximum number of results to return"
-                        }
+                    "topic": {
+                        "type": "string",
+                        "description": "Filter by topic name"
+                    },
+                    "presidential_doc_type": {
+                        "type": "string",
+                        "description": "Filter by presidential document type"
+                    },
+                    "executive_order": {
+                        "type": "string",
+                        "description": "Filter by executive order number"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of results to return"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Offset for pagination"
+                    }
+                },
+                "required": []
+            }
+        },
+        {
+            "name": "get_recent_documents",
+            "description": "Get the most recent documents in the Federal Registry",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of documents to return"
+                    }
+                },
+                "required": []
+            }
+        },
+        {
+            "name": "get_document_by_id",
+            "description": "Get a document by its ID",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "document_id": {
+                        "type": "integer",
+                        "description": "The document ID"
+                    }
+                },
+                "required": ["document_id"]
+            }
+        },
+        {
+            "name": "get_document_types",
+            "description": "Get all document types in the database",
+            "parameters": {
+                "type": "object",
+                "properties": {},
+                "required": []
+            }
+        },
+        {
+            "name": "get_agencies",
+            "description": "Get all agencies in the database",
+            "parameters": {
+                "type": "object",
+                "properties": {},
+                "required": []
+            }
+        },
+        {
+            "name": "get_topics",
+            "description": "Get all topics in the database",
+            "parameters": {
+                "type": "object",
+                "properties": {},
+                "required": []
+            }
+        },
+        {
+            "name": "get_presidential_document_types",
+            "description": "Get all presidential document types in the database",
+            "parameters": {
+                "type": "object",
+                "properties": {},
+                "required": []
+            }
+        },
+        {
+            "name": "search_recent_executive_orders",
+            "description": "Search for recent executive orders",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "days": {
+                        "type": "integer",
+                        "description": "Number of days in the past to search"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of results to return"
+                    }
+                },
+                "required": []
+            }
+        },
+        {
+            "name": "search_documents_by_date_range",
+            "description": "Search for documents within a date range",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "start_date": {
+                        "type": "string",
+                        "description": "Start date (YYYY-MM-DD)"
+                    },
+                    "end_date": {
+                        "type": "string",
+                        "description": "End date (YYYY-MM-DD)"
                     },
-                    "required": ["agency", "topic"]
-                }
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of results to return"
+                    }
+                },
+                "required": ["start_date", "end_date"]
             }
-        ]
+        },
+        {
+            "name": "search_by_agency_and_topic",
+            "description": "Search for documents by agency and topic",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "agency": {
+                        "type": "string",
+                        "description": "Agency name"
+                    },
+                    "topic": {
+                        "type": "string",
+                        "description": "Topic name"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of results to return"
+                    }
+                },
+                "required": ["agency", "topic"]
+            }
+        }
+    ]
+    
+    # Tools the model may call, dispatched by name on FederalRegistryTools
+    TOOL_NAMES = frozenset(tool["name"] for tool in TOOL_DESCRIPTIONS)
+    
+    # Compiled parameter validators so malformed calls never reach the database
+    PARAMETER_VALIDATORS = {
+        tool["name"]: fastjsonschema.compile(tool["parameters"]) for tool in TOOL_DESCRIPTIONS
+    }
+    
+    # Declared type of each parameter, for coercion ahead of validation
+    PARAMETER_TYPES = {
+        tool["name"]: {
+            name: spec.get("type") for name, spec in tool["parameters"].get("properties", {}).items()
+        }
+        for tool in TOOL_DESCRIPTIONS
+    }
+    
+    def __init__(self):
+        self.tools = FederalRegistryTools()
+        self.ollama_base_url = OLLAMA_BASE_URL
+        self.model = OLLAMA_MODEL
+        self.chat_history = TTLCache(maxsize=CHAT_HISTORY_MAXSIZE, ttl=CHAT_HISTORY_TTL)
+        self._session = None
+        self._exact_cache = TTLCache(maxsize=RESPONSE_CACHE_MAXSIZE, ttl=RESPONSE_CACHE_TTL)
+        self._system_message_cached = None
     
     async def init(self):
         """Initialize the agent and connect to the database."""
         await self.tools.connect()
+        
+        # Persistent HTTP session so Ollama calls reuse keep-alive connections
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=16,
+                keepalive_timeout=30,
+                ttl_dns_cache=300
+            ),
+            timeout=aiohttp.ClientTimeout(
+                total=None,
+                sock_connect=OLLAMA_CONNECT_TIMEOUT,
+                sock_read=OLLAMA_READ_TIMEOUT
+            )
+        )
     
     async def close(self):
         """Close the agent's resources."""
+        if self._session:
+            await self._session.close()
+            self._session = None
         await self.tools.close()
     
-    async def _ollama_chat_completion(self, messages):
+    async def _ollama_chat_stream(self, messages):
         """
-        Send a request to Ollama API for chat completion.
+        Stream a chat completion from the Ollama API.
         
         Args:
             messages: List of message dictionaries
             
-        Returns:
-            Response from Ollama API
+        Yields:
+            Content pieces as the model generates them
         """
         endpoint = f"{self.ollama_base_url}/api/chat"
         payload = {
             "model": self.model,
             "messages": messages,
-            "stream": False,  # Explicitly disable streaming
+            "stream": True,
             "options": {
                 "temperature": 0.7,
                 "top_p": 0.9,
@@ -250,28 +420,68 @@ class OllamaAgent:
         }
         
         try:
-            logger.info(f"Sending request to Ollama API: {endpoint}")
-            logger.info(f"Payload: {json.dumps(payload, indent=2)}")
+            logger.info("Sending request to Ollama API: %s", endpoint)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Payload: %s", orjson.dumps(payload, default=str).decode())
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(endpoint, json=payload) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    logger.info(f"Received response from Ollama: {json.dumps(data, indent=2)}")
+            async with self._session.post(
+                endpoint,
+                data=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"}
+            ) as response:
+                response.raise_for_status()
+                
+                # Ollama streams one JSON object per line
+                async for line in response.content:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    
+                    chunk = orjson.loads(line)
+                    if 'error' in chunk:
+                        raise RuntimeError(chunk['error'])
                     
-                    # Handle both streaming and non-streaming responses
-                    if isinstance(data, dict) and 'message' in data:
-                        return {
-                            "message": {
-                                "content": data['message'].get('content', ''),
-                                "role": data['message'].get('role', 'assistant')
-                            }
-                        }
-                    return data
+                    piece = (chunk.get('message') or {}).get('content', '')
+                    if piece:
+                        yield piece
+                    
+                    if chunk.get('done'):
+                        break
         except Exception as e:
             logger.error(f"Error in Ollama API call: {str(e)}")
             raise
     
+    async def _ollama_chat_completion(self, messages, on_tool_call=None):
+        """
+        Send a request to Ollama API for chat completion.
+        
+        Args:
+            messages: List of message dictionaries
+            on_tool_call: Optional callback invoked with each tool call as soon
+                as its ```json block is complete, before generation finishes
+            
+        Returns:
+            Response from Ollama API
+        """
+        content = ""
+        scan_pos = 0
+        
+        async for piece in self._ollama_chat_stream(messages):
+            content += piece
+            
+            # Only rescan when a fence may have just been closed
+            if on_tool_call and '`' in piece:
+                for match in _JSON_BLOCK_RE.finditer(content, scan_pos):
+                    scan_pos = match.end()
+                    tool_call = self._parse_tool_call(match.group(1))
+                    if tool_call is not None:
+                        on_tool_call(tool_call)
+        
+        data = {"message": {"content": content, "role": "assistant"}}
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received response from Ollama: %s", orjson.dumps(data, default=str).decode())
+        return data
+    
     async def _execute_tool(self, tool_name, parameters):
         """
         Execute a tool with given parameters.
@@ -283,49 +493,61 @@ class OllamaAgent:
         Returns:
             Result of the tool execution
         """
-        logger.info(f"Executing tool: {tool_name} with parameters: {parameters}")
+        logger.info("Executing tool: %s with parameters: %s", tool_name, parameters)
         
-        if tool_name not in self.available_tools:
+        if tool_name not in self.TOOL_NAMES:
             return {"error": f"Tool not found: {tool_name}"}
         
+        if isinstance(parameters, dict):
+            types = self.PARAMETER_TYPES[tool_name]
+            parameters = {
+                name: _coerce_scalar(value, types.get(name)) for name, value in parameters.items()
+            }
+        
+        try:
+            self.PARAMETER_VALIDATORS[tool_name](parameters)
+        except fastjsonschema.JsonSchemaException as e:
+            return {"error": f"Invalid parameters for tool {tool_name}: {e.message}"}
+        
         try:
-            tool_func = self.available_tools[tool_name]
+            tool_func = getattr(self.tools, tool_name)
             result = await tool_func(**parameters)
             
             # Convert result to a more concise format if it's a list of documents
             if isinstance(result, list) and result and isinstance(result[0], dict) and 'document_number' in result[0]:
-                simplified_result = []
-                for doc in result:
-                    simplified_doc = {
-                        'id': doc.get('id'),
-                        'document_number': doc.get('document_number'),
-                        'document_type': doc.get('document_type'),
-                        'title': doc.get('title'),
-                        'publication_date': doc.get('publication_date'),
-                        'abstract': doc.get('abstract')
-                    }
-                    
-                    # Include presidential document info if available
-                    if doc.get('presidential_document_type'):
-                        simplified_doc['presidential_document_type'] = doc.get('presidential_document_type')
-                    if doc.get('executive_order_number'):
-                        simplified_doc['executive_order_number'] = doc.get('executive_order_number')
-                    
-                    # Add agencies and topics
-                    if 'agencies' in doc:
-                        simplified_doc['agencies'] = doc.get('agencies')
-                    if 'topics' in doc:
-                        simplified_doc['topics'] = doc.get('topics')
-                    
-                    simplified_result.append(simplified_doc)
-                
-                return simplified_result
+                return [
+                    {k: doc.get(k) for k in _DOC_KEYS}
+                    | {k: doc[k] for k in _PRESIDENTIAL_DOC_KEYS if doc.get(k)}
+                    | {k: doc[k] for k in _RELATION_KEYS if k in doc}
+                    for doc in result
+                ]
             
             return result
         except Exception as e:
             logger.error(f"Error executing tool {tool_name}: {str(e)}")
             return {"error": f"Error executing tool {tool_name}: {str(e)}"}
     
+    def _parse_tool_call(self, block):
+        """
+        Parse a fenced JSON block into a tool call.
+        
+        Args:
+            block: Text captured inside a ```json fence
+            
+        Returns:
+            Tool call dictionary, or None if the block is not a valid tool call
+        """
+        try:
+            tool_call = orjson.loads(block)
+        except orjson.JSONDecodeError:
+            logger.error(f"Failed to parse JSON: {block}")
+            return None
+        
+        # Check if it has required tool call fields
+        if isinstance(tool_call, dict) and tool_call.keys() >= {'name', 'parameters'}:
+            return tool_call
+        return None
+    
     def _extract_tool_calls(self, text):
         """
         Extract tool calls from the model's response text.
@@ -336,165 +558,267 @@ class OllamaAgent:
         Returns:
             List of tool call dictionaries
         """
-        # Pattern to match a JSON object (handles nested objects too)
-        json_pattern = r'```json\s*([\s\S]*?)\s*```'
-        
-        # Find all JSON blocks in the text
-        matches = re.findall(json_pattern, text)
-        
         tool_calls = []
-        for match in matches:
-            try:
-                # Parse the JSON
-                tool_call = json.loads(match)
-                
-                # Check if it has required tool call fields
-                if isinstance(tool_call, dict) and 'name' in tool_call and 'parameters' in tool_call:
-                    tool_calls.append(tool_call)
-            except json.JSONDecodeError:
-                logger.error(f"Failed to parse JSON: {match}")
-                continue
+        for match in _JSON_BLOCK_RE.finditer(text):
+            tool_call = self._parse_tool_call(match.group(1))
+            if tool_call is not None:
+                tool_calls.append(tool_call)
         
         return tool_calls
     
-    async def process_message(self, message, chat_id=None):
+    def _system_message(self):
         """
-        Process a user message and return the agent's response.
+        Get the system message, rebuilding it only when the date changes.
+        
+        Returns:
+            System message dictionary
+        """
+        today = datetime.now().strftime("%Y-%m-%d")
+        if self._system_message_cached is None or self._system_message_cached[0] != today:
+            self._system_message_cached = (today, {
+                "role": "system",
+                "content": f"{SYSTEM_PROMPT}The current date is {today}."
+            })
+        return self._system_message_cached[1]
+    
+    async def _summarize_history(self, previous_summary, messages):
+        """
+        Summarize dropped conversation turns with a one-shot Ollama call.
+        
+        Args:
+            previous_summary: Existing rolling summary, possibly empty
+            messages: Messages being dropped from the window
+            
+        Returns:
+            Updated summary text
+        """
+        transcript = "\n".join(
+            f"{m['role']}: {m['content'][:SUMMARY_MESSAGE_CHARS]}" for m in messages
+        )
+        if previous_summary:
+            transcript = f"Earlier summary: {previous_summary}\n{transcript}"
+        
+        response = await self._ollama_chat_completion([
+            {
+                "role": "system",
+                "content": "Summarize this conversation in a few sentences. Keep document numbers, "
+                           "dates, agencies and other facts the user may refer back to."
+            },
+            {"role": "user", "content": transcript}
+        ])
+        return response.get("message", {}).get("content", "").strip()
+    
+    async def _compact_history(self, history):
+        """
+        Fold turns outside the sliding window into a rolling summary message.
+        
+        History may grow HISTORY_COMPACT_SLACK_TURNS turns past the window
+        before it is summarized and trimmed back to the window.
+        
+        Args:
+            history: Message list for one conversation, compacted in place
+        """
+        window = 2 * MAX_HISTORY_TURNS
+        
+        has_summary = bool(history) and history[0]["role"] == "system" \
+            and history[0]["content"].startswith(SUMMARY_PREFIX)
+        start = 1 if has_summary else 0
+        if len(history) - start <= window + 2 * HISTORY_COMPACT_SLACK_TURNS:
+            return
+        
+        previous_summary = history[0]["content"][len(SUMMARY_PREFIX):] if has_summary else ""
+        try:
+            summary = await self._summarize_history(previous_summary, history[start:-window])
+        except Exception as e:
+            # Still trim so the payload stays bounded; keep whatever summary we had
+            logger.error(f"Error summarizing chat history: {str(e)}")
+            summary = previous_summary
+        
+        history[:-window] = [{"role": "system", "content": SUMMARY_PREFIX + summary}] if summary else []
+    
+    def _response_cache_key(self, message, history):
+        """
+        Build the exact-match cache key for a user message.
+        
+        The key covers the normalized message and the last assistant turn so
+        follow-up questions are only reused in the same conversational context.
         
         Args:
             message: User message text
-            chat_id: Chat ID for conversation tracking
+            history: Message list for the conversation
             
         Returns:
-            Agent's response
+            Hex digest cache key
+        """
+        last_assistant_turn = next(
+            (m["content"] for m in reversed(history) if m["role"] == "assistant"),
+            ""
+        )
+        normalized = " ".join(message.lower().split())
+        return hashlib.sha1(f"{normalized}\x00{last_assistant_turn}".encode()).hexdigest()
+    
+    def _cache_response(self, key, response):
+        """Store a final response in the bounded, expiring response cache."""
+        self._exact_cache[key] = response
+    
+    async def _respond(self, message, chat_id):
         """
-        # Initialize chat history if it's a new conversation
-        if chat_id not in self.chat_history:
-            self.chat_history = []
-        
-        # Create the system message
-        system_message = {
-            "role": "system",
-            "content": """You are a helpful assistant that can access and search through the Federal Registry database.
-            Your goal is to help users find information about federal documents, executive orders, rules, and notices.
+        Run one conversational turn, yielding the reply as it is produced.
+        
+        Tool-using turns stream the final answer token by token; other turns
+        yield the complete reply once.
+        
+        Args:
+            message: User message text
+            chat_id: Chat ID for conversation tracking
             
-            You have access to the following tools:
-            1. search_documents - Search for documents with various filters
-               Parameters: keywords, date_from, date_to, document_type, agency, topic, presidential_doc_type, executive_order, limit, offset
-            2. get_recent_documents - Get the most recent documents
-               Parameters: limit
-            3. get_document_by_id - Get a specific document by ID
-               Parameters: document_id
-            4. get_document_types - Get all document types
-            5. get_agencies - Get all agencies
-            6. get_topics - Get all topics
-            7. get_presidential_document_types - Get all presidential document types
-            8. search_recent_executive_orders - Search for recent executive orders
-               Parameters: days, limit
-            9. search_documents_by_date_range - Search documents within a date range
-               Parameters: start_date, end_date, limit
-            10. search_by_agency_and_topic - Search documents by agency and topic
-                Parameters: agency, topic, limit
-
-            To use a tool, format your tool call as follows:
-            ```json
-            {
-                "name": "tool_name",
-                "parameters": {
-                    "param1": "value1",
-                    "param2": "value2"
-                }
-            }
-            ```
-
-            Examples:
-            1. To search documents from a specific date:
-            ```json
-            {
-                "name": "search_documents",
-                "parameters": {
-                    "date_from": "2025-01-01",
-                    "date_to": "2025-01-31"
-                }
-            }
-            ```
-
-            2. To search recent executive orders:
-            ```json
-            {
-                "name": "search_recent_executive_orders",
-                "parameters": {
-                    "days": 30,
-                    "limit": 10
-                }
-            }
-            ```
-
-            Always use these exact tool names and parameters. Do not invent new tool names.
-            The current date is """ + datetime.now().strftime("%Y-%m-%d") + """.
-            """
-        }
+        Yields:
+            Pieces of the agent's response
+        """
+        # Requests without a chat_id are stateless; named conversations are
+        # re-inserted each turn so the TTL counts from their last message
+        if chat_id is None:
+            history = []
+        else:
+            history = self.chat_history.get(chat_id, [])
+            self.chat_history[chat_id] = history
+        
+        system_message = self._system_message()
+        
+        # Short-circuit repeated questions asked in the same context
+        cache_key = self._response_cache_key(message, history)
+        cached_response = self._exact_cache.get(cache_key)
         
         # Add user message to the conversation
-        self.chat_history.append({"role": "user", "content": message})
+        history.append({"role": "user", "content": message})
+        
+        if cached_response is not None:
+            history.append({"role": "assistant", "content": cached_response})
+            yield cached_response
+            return
+        
+        # Tools started while the model is still generating, keyed by canonical call
+        tool_tasks = {}
+        
+        def start_tool(tool_call):
+            key = orjson.dumps(
+                [tool_call.get("name"), tool_call.get("parameters", {})],
+                option=orjson.OPT_SORT_KEYS
+            )
+            # Identical calls in one turn share a single execution
+            if key not in tool_tasks:
+                tool_tasks[key] = asyncio.create_task(
+                    self._execute_tool(tool_call.get("name"), tool_call.get("parameters", {}))
+                )
+            return key
+        
+        # Keep the prompt bounded regardless of conversation length
+        await self._compact_history(history)
         
         # Prepare messages for the chat completion
-        messages = [system_message] + self.chat_history
+        messages = [system_message] + history
         
         try:
-            # Get the model's response
-            response = await self._ollama_chat_completion(messages)
+            # Get the model's response, dispatching tool calls as they stream in
+            response = await self._ollama_chat_completion(messages, on_tool_call=start_tool)
             model_response = response.get("message", {}).get("content", "")
             
             # Extract tool calls from the response
             tool_calls = self._extract_tool_calls(model_response)
             
-            # If there are tool calls, execute them
-            if tool_calls:
-                tool_results = []
-                for tool_call in tool_calls:
-                    tool_name = tool_call.get("name")
-                    parameters = tool_call.get("parameters", {})
-                    
-                    # Execute the tool
-                    result = await self._execute_tool(tool_name, parameters)
-                    
-                    # Add result to the list
-                    tool_results.append({
-                        "tool_name": tool_name,
-                        "parameters": parameters,
-                        "result": result
-                    })
-                
-                # Add tool results to the conversation
-                tool_results_message = {
-                    "role": "system",
-                    "content": f"Tool call results: {json.dumps(tool_results, default=str)}"
-                }
-                
-                self.chat_history.append({"role": "assistant", "content": model_response})
-                self.chat_history.append(tool_results_message)
-                
-                # Get the final response from the model with the tool results
-                final_response = await self._ollama_chat_completion(messages + [
-                    {"role": "assistant", "content": model_response},
-                    tool_results_message
-                ])
-                
-                # Update conversation history
-                assistant_message = final_response.get("message", {}).get("content", "")
-                self.chat_history.append({"role": "assistant", "content": assistant_message})
-                
-                return assistant_message
-            else:
-                # If there are no tool calls, just return the model's response
-                self.chat_history.append({"role": "assistant", "content": model_response})
-                return model_response
+            # Calls already dispatched while streaming are reused, not rerun
+            keys = [start_tool(tool_call) for tool_call in tool_calls]
+            
+            # Tool calls are independent, so they run concurrently
+            results = dict(zip(
+                tool_tasks,
+                await asyncio.gather(*tool_tasks.values(), return_exceptions=True)
+            ))
+        finally:
+            # If the stream failed, tools it already dispatched must not keep running unobserved
+            for task in tool_tasks.values():
+                task.cancel()
+        
+        # If there are tool calls, execute them
+        if tool_calls:
+            tool_results = []
+            for tool_call, key in zip(tool_calls, keys):
+                tool_name = tool_call.get("name")
+                result = results[key]
+                if isinstance(result, Exception):
+                    result = {"error": f"Error executing tool {tool_name}: {str(result)}"}
                 
+                # Add result to the list
+                tool_results.append({
+                    "tool_name": tool_name,
+                    "parameters": tool_call.get("parameters", {}),
+                    "result": result
+                })
+            
+            # Add tool results to the conversation
+            tool_results_message = {
+                "role": "system",
+                "content": f"Tool call results: {orjson.dumps(tool_results, default=str).decode()}"
+            }
+            
+            history.append({"role": "assistant", "content": model_response})
+            history.append(tool_results_message)
+            
+            # Stream the final response from the model with the tool results
+            assistant_message = ""
+            async for piece in self._ollama_chat_stream(messages + [
+                {"role": "assistant", "content": model_response},
+                tool_results_message
+            ]):
+                assistant_message += piece
+                yield piece
+            
+            # Update conversation history
+            history.append({"role": "assistant", "content": assistant_message})
+            self._cache_response(cache_key, assistant_message)
+        else:
+            # If there are no tool calls, just yield the model's response
+            history.append({"role": "assistant", "content": model_response})
+            self._cache_response(cache_key, model_response)
+            yield model_response
+    
+    async def process_message(self, message, chat_id=None):
+        """
+        Process a user message and return the agent's response.
+        
+        Args:
+            message: User message text
+            chat_id: Chat ID for conversation tracking
+            
+        Returns:
+            AgentReply with the agent's response
+        """
+        try:
+            return AgentReply("".join([piece async for piece in self._respond(message, chat_id)]))
+        except Exception as e:
+            logger.error(f"Error processing message: {str(e)}")
+            return AgentReply(ERROR_RESPONSE, error=True)
+    
+    async def process_message_stream(self, message, chat_id=None):
+        """
+        Process a user message, yielding the agent's response as it is generated.
+        
+        Args:
+            message: User message text
+            chat_id: Chat ID for conversation tracking
+            
+        Yields:
+            Pieces of the agent's response
+        """
+        try:
+            async for piece in self._respond(message, chat_id):
+                yield piece
         except Exception as e:
             logger.error(f"Error processing message: {str(e)}")
-            return f"I'm sorry, but I encountered an error while processing your request. Please try again later."
+            yield ERROR_RESPONSE
     
     def reset_chat(self):
         """Reset the chat history."""
-        self.chat_history = []
\ No newline at end of file
+        self.chat_history.clear()
+        self._exact_cache.clear()
+        self.tools.cache_clear()
\ No newline at end of file
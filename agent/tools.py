@@ -1,22 +1,32 @@
 import asyncio
+import functools
 import logging
+import time
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 
 from database.db_manager import DatabaseManager
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger('tools')
 
+# Repeated searches are memoized here; the metadata lists are cached by DatabaseManager
+SEARCH_CACHE_TTL = 600
+CACHE_MAXSIZE = 256
+
+@functools.lru_cache(maxsize=64)
+def _date_days_ago(today_ordinal: int, days: int) -> str:
+    """Return the ISO date `days` before the given ordinal day."""
+    return (date.fromordinal(today_ordinal) - timedelta(days=days)).isoformat()
+
 class FederalRegistryTools:
     """Tools for querying Federal Registry data."""
     
+    __slots__ = ('db_manager', '_cache')
+    
     def __init__(self):
         self.db_manager = DatabaseManager()
+        self._cache = OrderedDict()
         
     async def connect(self):
         """Connect to the database."""
@@ -26,6 +36,37 @@ class FederalRegistryTools:
         """Close the database connection."""
         await self.db_manager.close()
     
+    def cache_clear(self):
+        """Drop all memoized tool results."""
+        self._cache.clear()
+    
+    async def _cached(self, key, ttl, loader):
+        """
+        Return a memoized result for key, calling loader on a miss or expiry.
+        
+        Args:
+            key: Hashable cache key
+            ttl: Time to live in seconds
+            loader: Zero-argument coroutine function producing the value
+            
+        Returns:
+            Cached or freshly loaded value
+        """
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._cache.move_to_end(key)
+            return entry[1]
+        
+        value = await loader()
+        
+        # Don't pin empty results, they are usually a transient DB failure
+        if value:
+            self._cache[key] = (time.monotonic() + ttl, value)
+            self._cache.move_to_end(key)
+            if len(self._cache) > CACHE_MAXSIZE:
+                self._cache.popitem(last=False)
+        return value
+    
     async def search_documents(self, 
                             keywords: Optional[str] = None, 
                             date_from: Optional[str] = None, 
@@ -55,21 +96,22 @@ class FederalRegistryTools:
         Returns:
             List of matching documents
         """
-        query_params = {
-            'keywords': keywords,
-            'date_from': date_from,
-            'date_to': date_to,
-            'document_type': document_type,
-            'agency': agency,
-            'topic': topic,
-            'presidential_doc_type': presidential_doc_type,
-            'executive_order': executive_order,
-            'limit': limit,
-            'offset': offset
-        }
-        
-        # Clean up None values
-        query_params = {k: v for k, v in query_params.items() if v is not None}
+        # Only pass the filters that were actually given
+        query_params = {k: v for k, v in (
+            ('keywords', keywords),
+            ('date_from', date_from),
+            ('date_to', date_to),
+            ('document_type', document_type),
+            ('agency', agency),
+            ('topic', topic),
+            ('presidential_doc_type', presidential_doc_type),
+            ('executive_order', executive_order),
+            ('limit', limit),
+            ('offset', offset)
+        ) if v is not None}
+        
+        # The agent summarizes results from their abstracts
+        query_params['include_body'] = True
         
         try:
             documents = await self.db_manager.search_documents(query_params)
@@ -89,7 +131,7 @@ class FederalRegistryTools:
             List of document dictionaries
         """
         try:
-            return await self.db_manager.get_recent_documents(limit)
+            return await self.db_manager.get_recent_documents(limit, include_body=True)
         except Exception as e:
             logger.error(f"Error getting recent documents: {str(e)}")
             return []
@@ -173,12 +215,16 @@ class FederalRegistryTools:
         Returns:
             List of matching documents
         """
-        date_from = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        date_from = _date_days_ago(date.today().toordinal(), days)
         
-        return await self.search_documents(
-            presidential_doc_type="Executive Order",
-            date_from=date_from,
-            limit=limit
+        return await self._cached(
+            ('search_recent_executive_orders', date_from, limit),
+            SEARCH_CACHE_TTL,
+            lambda: self.search_documents(
+                presidential_doc_type="Executive Order",
+                date_from=date_from,
+                limit=limit
+            )
         )
     
     async def search_documents_by_date_range(self, start_date: str, end_date: str, limit: int = 10) -> List[Dict[str, Any]]:
@@ -211,8 +257,12 @@ class FederalRegistryTools:
         Returns:
             List of matching documents
         """
-        return await self.search_documents(
-            agency=agency,
-            topic=topic,
-            limit=limit
+        return await self._cached(
+            ('search_by_agency_and_topic', agency, topic, limit),
+            SEARCH_CACHE_TTL,
+            lambda: self.search_documents(
+                agency=agency,
+                topic=topic,
+                limit=limit
+            )
         )
\ No newline at end of file
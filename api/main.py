@@ -1,17 +1,25 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
+from cachetools import TTLCache
 from typing import Optional, List, Dict, Any
 import uvicorn
+import orjson
 import asyncio
 import os
+import hashlib
 from pathlib import Path
 import logging
 
 from agent.agent import OllamaAgent
 from config import API_HOST, API_PORT
+from logging_setup import setup_logging
+
+# Uvicorn workers import this module directly, so it is an entry point too
+setup_logging()
 
 # Create FastAPI app
 app = FastAPI(title="Federal Registry Search API")
@@ -37,6 +45,20 @@ agent = OllamaAgent()
 # Set up logger
 logger = logging.getLogger(__name__)
 
+# Set once the agent has connected; /search and /health report 503 until then
+_ready = asyncio.Event()
+_init_task = None
+
+# Last initialization error, cleared once an attempt succeeds
+_init_error = None
+
+# Seconds before retrying a failed initialization, doubling up to the maximum
+INIT_RETRY_DELAY = 1
+INIT_RETRY_MAX_DELAY = 60
+
+# Serialized responses for stateless (no chat_id) queries
+_response_cache = TTLCache(maxsize=1024, ttl=300)
+
 class SearchRequest(BaseModel):
     query: str
     chat_id: Optional[str] = None
@@ -44,14 +66,42 @@ class SearchRequest(BaseModel):
 class SearchResponse(BaseModel):
     response: str
 
+async def _init_agent():
+    """Initialize the agent in the background, retrying with backoff, and flag the app as ready."""
+    global _init_error
+    delay = INIT_RETRY_DELAY
+    while True:
+        try:
+            await agent.init()
+        except Exception as e:
+            _init_error = str(e)
+            logger.error(f"Error initializing agent, retrying in {delay}s: {str(e)}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, INIT_RETRY_MAX_DELAY)
+            continue
+        
+        _init_error = None
+        _ready.set()
+        logger.info("Agent initialized")
+        return
+
+def _require_ready():
+    """Raise 503 until the agent has initialized."""
+    if not _ready.is_set():
+        detail = "Service failed to initialize, retrying" if _init_error else "Service is warming up"
+        raise HTTPException(status_code=503, detail=detail)
+
 @app.on_event("startup")
 async def startup_event():
-    """Initialize the agent on startup."""
-    await agent.init()
+    """Start agent initialization without blocking the server from accepting connections."""
+    global _init_task
+    _init_task = asyncio.create_task(_init_agent())
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up resources on shutdown."""
+    if _init_task and not _init_task.done():
+        _init_task.cancel()
     await agent.close()
 
 @app.get("/")
@@ -59,7 +109,8 @@ async def home(request: Request):
     """Render the home page."""
     return templates.TemplateResponse("index.html", {"request": request})
 
-@app.post("/search", response_model=SearchResponse)
+# SearchResponse documents the schema; the body itself is serialized with orjson
+@app.post("/search", response_model=SearchResponse, response_class=ORJSONResponse)
 async def search(request: SearchRequest):
     """
     Search the Federal Registry using natural language.
@@ -70,39 +121,95 @@ async def search(request: SearchRequest):
     Returns:
         Search response containing the agent's response
     """
+    # Stateless queries can be answered from the cache without touching the agent
+    cache_key = None
+    if request.chat_id is None:
+        normalized = " ".join(request.query.lower().split())
+        cache_key = hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+        cached = _response_cache.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+    
+    _require_ready()
+    
     try:
-        response = await agent.process_message(request.query, request.chat_id)
+        reply = await agent.process_message(request.query, request.chat_id)
         
-        # Handle different response formats
-        if isinstance(response, dict):
-            if 'message' in response and 'content' in response['message']:
-                return SearchResponse(response=response['message']['content'])
-            elif 'content' in response:
-                return SearchResponse(response=response['content'])
+        content = orjson.dumps({"response": reply.text})
+        if cache_key is not None and not reply.error:
+            _response_cache[cache_key] = content
         
-        # If response is a string, return it directly
-        if isinstance(response, str):
-            return SearchResponse(response=response)
-            
-        # If we can't parse the response, return it as a string
-        return SearchResponse(response=str(response))
+        return Response(content=content, media_type="application/json")
         
     except Exception as e:
         logger.error(f"Error processing search request: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _sse_events(query, chat_id):
+    """
+    Frame the agent's streamed response as server-sent events.
+    
+    Args:
+        query: User query text
+        chat_id: Chat ID for conversation tracking
+        
+    Yields:
+        One SSE frame per token, followed by a final done event
+    """
+    async for token in agent.process_message_stream(query, chat_id):
+        yield f"data: {orjson.dumps({'t': token}).decode()}\n\n"
+    yield "event: done\ndata: {}\n\n"
+
+@app.post("/search/stream")
+async def search_stream(request: SearchRequest):
+    """
+    Search the Federal Registry, streaming the agent's response as it is generated.
+    
+    Args:
+        request: Search request containing the query and optional chat_id
+        
+    Returns:
+        Server-sent event stream of response tokens
+    """
+    _require_ready()
+    
+    return StreamingResponse(
+        _sse_events(request.query, request.chat_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy"}
+    if not _ready.is_set():
+        if _init_error:
+            return ORJSONResponse({"status": "failed", "ready": False, "error": _init_error}, status_code=503)
+        return ORJSONResponse({"status": "starting", "ready": False}, status_code=503)
+    return {"status": "healthy", "ready": True}
 
 def start():
     """Start the FastAPI server."""
+    # Auto-reload is for local development only and can't be combined with workers
+    if os.getenv("DEV"):
+        uvicorn.run(
+            "api.main:app",
+            host=API_HOST,
+            port=API_PORT,
+            reload=True
+        )
+        return
+    
     uvicorn.run(
         "api.main:app",
         host=API_HOST,
         port=API_PORT,
-        reload=True
+        # Chat history, the response caches and the database pool are per process.
+        # More workers need sticky routing on chat_id, and DB_POOL_MAXSIZE sized so
+        # workers x pool stays below the server's max_connections.
+        workers=int(os.getenv("WEB_CONCURRENCY", 1)),
+        loop="auto",  # uvloop when installed
+        http="auto"   # httptools when installed
     )
 
 if __name__ == "__main__":
@@ -1,26 +1,51 @@
 import aiohttp
-import aiofiles
-import json
 import os
 import asyncio
+import time
 from datetime import datetime, timedelta
 import logging
 
+import orjson
+
 from config import FEDERAL_REGISTRY_API_URL, RAW_DATA_DIR
+from data_pipeline.json_files import write_json
+from logging_setup import setup_logging
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger('downloader')
 
+# Maximum number of days downloaded at the same time
+MAX_CONCURRENT_DAYS = 8
+
+# Open connections to the API host; this is what paces page requests
+MAX_CONNECTIONS_PER_HOST = 4
+
+# Attempts per page when the API answers 429 Too Many Requests
+MAX_RETRIES = 5
+
 class FederalRegistryDownloader:
     """Downloads data from the Federal Registry API."""
     
     def __init__(self):
         self.api_url = FEDERAL_REGISTRY_API_URL
         self.raw_data_dir = RAW_DATA_DIR
+        self._session = None
+    
+    async def init(self):
+        """Open the HTTP session reused across downloads."""
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=MAX_CONCURRENT_DAYS,
+                limit_per_host=MAX_CONNECTIONS_PER_HOST,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            )
+        )
+    
+    async def close(self):
+        """Close the HTTP session."""
+        if self._session:
+            await self._session.close()
+            self._session = None
         
     async def download_data(self, days_to_fetch=7):
         """
@@ -33,88 +58,148 @@ class FederalRegistryDownloader:
             List of file paths where the downloaded data is stored
         """
         today = datetime.now()
+        dates = [
+            (today - timedelta(days=day_offset)).strftime('%Y-%m-%d')
+            for day_offset in range(days_to_fetch)
+        ]
+        
+        if not self._session:
+            await self.init()
+        
+        # Days are independent; the semaphore and connector cap load on the API
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_DAYS)
+        results = await asyncio.gather(
+            *[self._fetch_day(self._session, semaphore, date_str) for date_str in dates]
+        )
+        
+        return [file_path for day_files in results for file_path in day_files]
+    
+    async def _get_json(self, session, params):
+        """
+        GET one page from the API, backing off when rate limited.
+        
+        Args:
+            session: aiohttp client session
+            params: Query parameters
+        
+        Returns:
+            Parsed JSON response
+        """
+        for attempt in range(MAX_RETRIES):
+            async with session.get(self.api_url, params=params) as response:
+                if response.status == 429 and attempt < MAX_RETRIES - 1:
+                    delay = float(response.headers.get('Retry-After', 2 ** attempt))
+                    logger.warning("Rate limited, retrying in %ss", delay)
+                    await asyncio.sleep(delay)
+                    continue
+                
+                response.raise_for_status()
+                return orjson.loads(await response.read())
+    
+    async def _fetch_page(self, session, params, date_str):
+        """
+        Download one additional page for a publication date.
+        
+        Args:
+            session: aiohttp client session
+            params: Query parameters including the page number
+            date_str: Publication date (YYYY-MM-DD)
+        
+        Returns:
+            Path of the written page file
+        """
+        page = params['page']
+        logger.info("Downloading page %s for %s", page, date_str)
+        page_data = await self._get_json(session, params)
+        
+        # Save the data to file with page number
+        page_file_path = os.path.join(
+            self.raw_data_dir, 
+            f"federal_registry_{date_str}_page{page}.json"
+        )
+        await asyncio.to_thread(write_json, page_file_path, page_data)
+        
+        logger.info("Successfully downloaded page %s for %s", page, date_str)
+        return page_file_path
+    
+    async def _fetch_day(self, session, semaphore, date_str):
+        """
+        Download all pages for a single publication date.
+        
+        Args:
+            session: aiohttp client session
+            semaphore: Semaphore bounding concurrent days
+            date_str: Publication date (YYYY-MM-DD)
+        
+        Returns:
+            List of file paths written for this date
+        """
+        # Format file path
+        file_path = os.path.join(self.raw_data_dir, f"federal_registry_{date_str}.json")
+        
+        # Skip if file already exists and is less than 24 hours old
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            st = None
+        
+        if st and time.time() - st.st_mtime < 86400:
+            logger.info("Skipping download for %s - recent file exists", date_str)
+            return [file_path]
+        
+        # Prepare query parameters
+        params = {
+            'conditions[publication_date][is]': date_str,
+            'per_page': 100,  # Maximum allowed by the API
+            'page': 1,
+            'order': 'newest'
+        }
+        
         downloaded_files = []
         
-        async with aiohttp.ClientSession() as session:
-            for day_offset in range(days_to_fetch):
-                target_date = today - timedelta(days=day_offset)
-                date_str = target_date.strftime('%Y-%m-%d')
+        async with semaphore:
+            try:
+                logger.info("Downloading data for %s", date_str)
+                data = await self._get_json(session, params)
                 
-                # Format file path
-                file_path = os.path.join(self.raw_data_dir, f"federal_registry_{date_str}.json")
+                # Save the data to file
+                await asyncio.to_thread(write_json, file_path, data)
                 
-                # Skip if file already exists and is less than 24 hours old
-                if os.path.exists(file_path) and (datetime.now() - datetime.fromtimestamp(os.path.getmtime(file_path))).total_seconds() < 86400:
-                    logger.info(f"Skipping download for {date_str} - recent file exists")
-                    downloaded_files.append(file_path)
-                    continue
+                downloaded_files.append(file_path)
+                logger.info("Successfully downloaded data for %s", date_str)
                 
-                # Prepare query parameters
-                params = {
-                    'conditions[publication_date][is]': date_str,
-                    'per_page': 100,  # Maximum allowed by the API
-                    'page': 1,
-                    'order': 'newest'
-                }
+                # Page 1 tells us how many pages there are; fetch the rest together
+                total_pages = data.get('total_pages', 1)
+                current_page = data.get('current_page', 1)
                 
-                try:
-                    logger.info(f"Downloading data for {date_str}")
-                    response = await session.get(self.api_url, params=params)
-                    response.raise_for_status()
-                    
-                    data = await response.json()
-                    
-                    # Save the data to file
-                    async with aiofiles.open(file_path, 'w') as f:
-                        await f.write(json.dumps(data, indent=2))
-                    
-                    downloaded_files.append(file_path)
-                    logger.info(f"Successfully downloaded data for {date_str}")
-                    
-                    # Check if there are more pages
-                    total_pages = data.get('total_pages', 1)
-                    current_page = data.get('current_page', 1)
-                    
-                    # Fetch additional pages if needed
-                    while current_page < total_pages:
-                        current_page += 1
-                        params['page'] = current_page
-                        
-                        logger.info(f"Downloading page {current_page} for {date_str}")
-                        response = await session.get(self.api_url, params=params)
-                        response.raise_for_status()
-                        
-                        page_data = await response.json()
-                        
-                        # Save the data to file with page number
-                        page_file_path = os.path.join(
-                            self.raw_data_dir, 
-                            f"federal_registry_{date_str}_page{current_page}.json"
-                        )
-                        
-                        async with aiofiles.open(page_file_path, 'w') as f:
-                            await f.write(json.dumps(page_data, indent=2))
-                        
-                        downloaded_files.append(page_file_path)
-                        logger.info(f"Successfully downloaded page {current_page} for {date_str}")
-                        
-                        # Add a small delay to avoid rate limiting
-                        await asyncio.sleep(0.5)
-                    
-                    # Add a delay between days to avoid rate limiting
-                    await asyncio.sleep(1)
-                    
-                except Exception as e:
-                    logger.error(f"Error downloading data for {date_str}: {str(e)}")
-                    continue
+                results = await asyncio.gather(
+                    *[
+                        self._fetch_page(session, {**params, 'page': page}, date_str)
+                        for page in range(current_page + 1, total_pages + 1)
+                    ],
+                    return_exceptions=True
+                )
+                
+                for page, result in enumerate(results, start=current_page + 1):
+                    if isinstance(result, Exception):
+                        logger.error("Error downloading page %s for %s: %s", page, date_str, result)
+                    else:
+                        downloaded_files.append(result)
+                
+            except Exception as e:
+                logger.error("Error downloading data for %s: %s", date_str, e)
         
         return downloaded_files
 
 # For testing purposes
 async def main():
     downloader = FederalRegistryDownloader()
-    files = await downloader.download_data(days_to_fetch=7)
-    logger.info(f"Downloaded {len(files)} files")
+    try:
+        files = await downloader.download_data(days_to_fetch=7)
+        logger.info(f"Downloaded {len(files)} files")
+    finally:
+        await downloader.close()
 
 if __name__ == "__main__":
+    setup_logging()
     asyncio.run(main())
\ No newline at end of file
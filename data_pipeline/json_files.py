@@ -0,0 +1,11 @@
+import os
+from pathlib import Path
+
+import orjson
+
+# Files are machine-read by the next stage; set DEBUG_JSON to pretty-print them
+JSON_DUMP_OPTIONS = orjson.OPT_INDENT_2 if os.getenv("DEBUG_JSON") else 0
+
+def write_json(file_path, data):
+    """Serialize data and write it to file_path; call it in a worker thread."""
+    Path(file_path).write_bytes(orjson.dumps(data, option=JSON_DUMP_OPTIONS))
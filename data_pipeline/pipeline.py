@@ -8,14 +8,13 @@ from data_pipeline.downloader import FederalRegistryDownloader
 from data_pipeline.processor import FederalRegistryProcessor
 from database.db_manager import DatabaseManager
 from config import PROCESSED_DATA_DIR
+from logging_setup import setup_logging
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger('pipeline')
 
+# Documents accumulated across files before each database write
+STORE_BATCH_SIZE = 1000
+
 class FederalRegistryPipeline:
     """Main pipeline to download, process, and store Federal Registry data."""
     
@@ -23,7 +22,43 @@ class FederalRegistryPipeline:
         self.downloader = FederalRegistryDownloader()
         self.processor = FederalRegistryProcessor()
         self.db_manager = DatabaseManager()
+    
+    async def __aenter__(self):
+        await self.downloader.init()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.downloader.close()
+        
+    async def _store_batch(self, batch):
+        """
+        Store a batch of documents accumulated from one or more files.
         
+        Args:
+            batch: List of processed documents
+            
+        Returns:
+            Number of documents stored
+        """
+        try:
+            stored_count = await self.db_manager.store_documents(batch)
+            logger.info(f"Stored {stored_count} of {len(batch)} documents in batch")
+            
+            # Log document types and agencies for verification
+            if stored_count > 0:
+                doc_types = set(doc.get('type') for doc in batch if doc.get('type'))
+                agency_names = set()
+                for doc in batch:
+                    agency_names.update(doc.get('agencies', []))
+                
+                logger.info(f"Document types in this batch: {doc_types}")
+                logger.info(f"Agencies in this batch: {agency_names}")
+            
+            return stored_count
+        except Exception as e:
+            logger.error(f"Error storing batch of {len(batch)} documents: {str(e)}")
+            return 0
+    
     async def run_pipeline(self, days_to_fetch=7):
         """
         Run the complete pipeline: download -> process -> store in database.
@@ -41,10 +76,11 @@ class FederalRegistryPipeline:
             logger.info(f"Downloaded {len(downloaded_files)} files")
             
             # Get all raw data files
-            all_raw_files = []
-            for file_name in os.listdir(self.downloader.raw_data_dir):
-                if file_name.startswith('federal_registry_') and file_name.endswith('.json'):
-                    all_raw_files.append(os.path.join(self.downloader.raw_data_dir, file_name))
+            with os.scandir(self.downloader.raw_data_dir) as entries:
+                all_raw_files = [
+                    entry.path for entry in entries
+                    if entry.name.startswith('federal_registry_') and entry.name.endswith('.json') and entry.is_file()
+                ]
             
             logger.info(f"Found {len(all_raw_files)} total raw data files")
             
@@ -64,33 +100,28 @@ class FederalRegistryPipeline:
             # Ensure database connection is established
             await self.db_manager.connect()
             
+            # Documents are written in fixed-size batches that span file boundaries
+            batch = []
             for file_path in processed_files:
                 try:
                     with open(file_path, 'r') as f:
                         documents = json.load(f)
                     
                     if not documents:
-                        logger.warning(f"No documents found in {file_path}")
+                        logger.warning("No documents found in %s", file_path)
                         continue
                     
-                    # Store documents in database
-                    stored_count = await self.db_manager.store_documents(documents)
-                    documents_stored += stored_count
-                    logger.info(f"Stored {stored_count} documents from {file_path}")
-                    
-                    # Log document types and agencies for verification
-                    if stored_count > 0:
-                        doc_types = set(doc.get('document_type') for doc in documents if doc.get('document_type'))
-                        agency_names = set()
-                        for doc in documents:
-                            agency_names.update(doc.get('agency_names', []))
-                        
-                        logger.info(f"Document types in this batch: {doc_types}")
-                        logger.info(f"Agencies in this batch: {agency_names}")
-                    
+                    batch.extend(documents)
                 except Exception as e:
-                    logger.error(f"Error processing file {file_path}: {str(e)}")
+                    logger.error("Error processing file %s: %s", file_path, e)
                     continue
+                
+                if len(batch) >= STORE_BATCH_SIZE:
+                    documents_stored += await self._store_batch(batch)
+                    batch.clear()
+            
+            if batch:
+                documents_stored += await self._store_batch(batch)
             
             # Verify data was stored correctly
             if documents_stored > 0:
@@ -122,9 +153,10 @@ class FederalRegistryPipeline:
             return 0
 
 async def main():
-    pipeline = FederalRegistryPipeline()
     # Fetch last 90 days of data for initial setup
-    await pipeline.run_pipeline(days_to_fetch=90)
+    async with FederalRegistryPipeline() as pipeline:
+        await pipeline.run_pipeline(days_to_fetch=90)
 
 if __name__ == "__main__":
+    setup_logging()
     asyncio.run(main())
\ No newline at end of file
@@ -1,20 +1,100 @@
-import json
 import os
 import asyncio
-import aiofiles
 import logging
 from datetime import datetime
 import re
 
+import ijson
+
 from config import RAW_DATA_DIR, PROCESSED_DATA_DIR
+from data_pipeline.json_files import write_json
+from logging_setup import setup_logging
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger('processor')
 
+# Maximum number of files processed at the same time
+MAX_CONCURRENT_FILES = 16
+
+# Patterns used by _clean_text, compiled once
+_RE_HTML = re.compile(r'<[^>]+>')
+_RE_SPECIAL = re.compile(r'[^\w\s.,;:!?-]')
+
+# ASCII equivalent of _RE_SPECIAL as a str.translate table
+_SPECIAL_TRANSLATION = {
+    c: ' ' for c in range(128)
+    if not (chr(c).isalnum() or chr(c).isspace() or chr(c) in '_.,;:!?-')
+}
+
+def _clean_text(text):
+    """
+    Clean and normalize text content.
+    
+    Args:
+        text: Text to clean
+    
+    Returns:
+        Cleaned text
+    """
+    if not text:
+        return ""
+        
+    # Remove HTML tags
+    text = _RE_HTML.sub(' ', text)
+    
+    # Remove special characters but keep basic punctuation; ASCII text
+    # takes the single C-level translate pass
+    if text.isascii():
+        text = text.translate(_SPECIAL_TRANSLATION)
+    else:
+        text = _RE_SPECIAL.sub(' ', text)
+    
+    # Collapse and trim whitespace
+    return ' '.join(text.split())
+
+def _name(value):
+    """Return the display name of an API value that may be an object or a plain string."""
+    return value.get('name') if isinstance(value, dict) else value
+
+def _transform_doc(doc, processed_at):
+    """
+    Convert a raw API document into the processed schema stored in the database.
+    
+    Args:
+        doc: Raw document dictionary from the API
+        processed_at: ISO timestamp recorded on the document
+    
+    Returns:
+        Processed document dictionary
+    """
+    # Bound once; this runs for every document in the backfill
+    get = doc.get
+    
+    return {
+        'document_number': get('document_number'),
+        'publication_date': get('publication_date'),
+        'title': _clean_text(get('title')),
+        'type': get('type'),
+        'abstract': _clean_text(get('abstract')),
+        'html_url': get('html_url'),
+        'pdf_url': get('pdf_url'),
+        'full_text_xml_url': get('full_text_xml_url'),
+        'agencies': [_name(agency) for agency in get('agencies') or []],
+        'topics': [_name(topic) for topic in get('topics') or []],
+        'presidential_document_type': _name(get('presidential_document_type')) or None,
+        'signing_date': get('signing_date'),
+        'executive_order_number': get('executive_order_number'),
+        'docket_ids': get('docket_ids', []),
+        'regulation_id_numbers': get('regulation_id_numbers', []),
+        'comments_close_date': get('comments_close_date'),
+        'effective_date': get('effective_date'),
+        'citation': get('citation'),
+        'page_length': get('page_length'),
+        'start_page': get('start_page'),
+        'end_page': get('end_page'),
+        'raw_text': _clean_text(get('raw_text')),
+        'processed_at': processed_at
+    }
+
 class FederalRegistryProcessor:
     """Processes downloaded Federal Registry data."""
     
@@ -22,6 +102,33 @@ class FederalRegistryProcessor:
         self.raw_data_dir = RAW_DATA_DIR
         self.processed_data_dir = PROCESSED_DATA_DIR
     
+    def _process_documents(self, file_path):
+        """
+        Stream documents out of a raw API page and transform them.
+        
+        Only one raw document is held in memory at a time. Runs in a worker
+        thread since ijson is synchronous.
+        
+        Args:
+            file_path: Path to the raw data file
+        
+        Returns:
+            List of processed document dictionaries
+        """
+        processed_at = datetime.now().isoformat()
+        processed_docs = []
+        append = processed_docs.append
+        
+        with open(file_path, 'rb') as f:
+            for doc in ijson.items(f, 'results.item', use_float=True):
+                try:
+                    append(_transform_doc(doc, processed_at))
+                except Exception as e:
+                    logger.error("Error processing document %s: %s", doc.get('document_number'), e)
+                    continue
+        
+        return processed_docs
+    
     async def process_file(self, file_path):
         """
         Process a single downloaded file.
@@ -30,50 +137,36 @@ class FederalRegistryProcessor:
             file_path: Path to the raw data file
             
         Returns:
-            Path to the processed file
+            Path to the processed file, or None if nothing was written
         """
+        # Create output file name
+        file_name = os.path.basename(file_path)
+        processed_file_path = os.path.join(self.processed_data_dir, f"processed_{file_name}")
+        
         try:
-            # Read the raw data
-            async with aiofiles.open(file_path, 'r') as f:
-                content = await f.read()
-            
-            data = json.loads(content)
-            
-            # Extract relevant information from the results
-            processed_docs = []
-            
-            for doc in data.get('results', []):
-                processed_doc = {
-                    'document_number': doc.get('document_number'),
-                    'document_type': doc.get('type'),
-                    'title': doc.get('title'),
-                    'publication_date': doc.get('publication_date'),
-                    'abstract': doc.get('abstract') or '',
-                    'agency_names': [a.get('name') for a in doc.get('agencies', [])],
-                    'html_url': doc.get('html_url'),
-                    'pdf_url': doc.get('pdf_url'),
-                    'full_text_xml_url': doc.get('full_text_xml_url'),
-                    'presidential_document_type': doc.get('presidential_document_type', {}).get('name') if doc.get('presidential_document_type') else None,
-                    'signing_date': doc.get('signing_date'),
-                    'executive_order_number': doc.get('executive_order_number'),
-                    'topics': [t.get('name') for t in doc.get('topics', [])],
-                }
-                processed_docs.append(processed_doc)
-            
-            # Create output file name
-            file_name = os.path.basename(file_path)
-            processed_file_path = os.path.join(self.processed_data_dir, f"processed_{file_name}")
+            # Skip files whose output is already newer than the source
+            try:
+                if os.stat(processed_file_path).st_mtime >= os.stat(file_path).st_mtime:
+                    logger.info("Skipping %s, already processed", file_path)
+                    return processed_file_path
+            except FileNotFoundError:
+                pass
             
-            # Write processed data to file
-            async with aiofiles.open(processed_file_path, 'w') as f:
-                await f.write(json.dumps(processed_docs, indent=2))
+            # Parse and transform off the event loop, one document at a time
+            processed_docs = await asyncio.to_thread(self._process_documents, file_path)
             
-            logger.info(f"Successfully processed {file_path}")
-            return processed_file_path
+            # Save processed documents to file
+            if processed_docs:
+                # Encode and write off the event loop
+                await asyncio.to_thread(write_json, processed_file_path, processed_docs)
+                
+                logger.info("Successfully processed %s -> %s", file_path, processed_file_path)
+                return processed_file_path
             
         except Exception as e:
-            logger.error(f"Error processing {file_path}: {str(e)}")
-            return None
+            logger.error("Error processing file %s: %s", file_path, e)
+        
+        return None
     
     async def process_data(self, file_paths):
         """
@@ -85,100 +178,19 @@ class FederalRegistryProcessor:
         Returns:
             List of paths to processed files
         """
-        processed_file_paths = []
-        
-        for file_path in file_paths:
-            try:
-                async with aiofiles.open(file_path, 'r') as f:
-                    content = await f.read()
-                    data = json.loads(content)
-                
-                # Extract documents from the response
-                documents = data.get('results', [])
-                processed_docs = []
-                
-                for doc in documents:
-                    try:
-                        # Extract basic metadata
-                        processed_doc = {
-                            'document_number': doc.get('document_number'),
-                            'publication_date': doc.get('publication_date'),
-                            'title': doc.get('title'),
-                            'type': doc.get('type'),
-                            'abstract': doc.get('abstract', ''),
-                            'html_url': doc.get('html_url'),
-                            'pdf_url': doc.get('pdf_url'),
-                            'full_text_xml_url': doc.get('full_text_xml_url'),
-                            'agencies': [agency.get('name') for agency in doc.get('agencies', [])],
-                            'docket_ids': doc.get('docket_ids', []),
-                            'regulation_id_numbers': doc.get('regulation_id_numbers', []),
-                            'comments_close_date': doc.get('comments_close_date'),
-                            'effective_date': doc.get('effective_date'),
-                            'citation': doc.get('citation'),
-                            'page_length': doc.get('page_length'),
-                            'start_page': doc.get('start_page'),
-                            'end_page': doc.get('end_page'),
-                            'raw_text': doc.get('raw_text', ''),
-                            'processed_at': datetime.now().isoformat()
-                        }
-                        
-                        # Clean and normalize text fields
-                        for field in ['title', 'abstract', 'raw_text']:
-                            if field in processed_doc:
-                                processed_doc[field] = self._clean_text(processed_doc[field])
-                        
-                        # Add document to processed list
-                        processed_docs.append(processed_doc)
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing document {doc.get('document_number')}: {str(e)}")
-                        continue
-                
-                # Save processed documents to file
-                if processed_docs:
-                    # Create output file name
-                    file_name = os.path.basename(file_path)
-                    processed_file_path = os.path.join(self.processed_data_dir, f"processed_{file_name}")
-                    
-                    # Write processed data to file
-                    async with aiofiles.open(processed_file_path, 'w') as f:
-                        await f.write(json.dumps(processed_docs, indent=2))
-                    
-                    processed_file_paths.append(processed_file_path)
-                    logger.info(f"Successfully processed {file_path} -> {processed_file_path}")
-                
-            except Exception as e:
-                logger.error(f"Error processing file {file_path}: {str(e)}")
-                continue
-        
-        return processed_file_paths
-    
-    def _clean_text(self, text):
-        """
-        Clean and normalize text content.
-        
-        Args:
-            text: Text to clean
-        
-        Returns:
-            Cleaned text
-        """
-        if not text:
-            return ""
-            
-        # Remove HTML tags
-        text = re.sub(r'<[^>]+>', ' ', text)
-        
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        # Files are independent; bound concurrency so we don't exhaust FDs
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FILES)
         
-        # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s.,;:!?-]', ' ', text)
+        async def process_bounded(file_path):
+            async with semaphore:
+                return await self.process_file(file_path)
         
-        # Normalize whitespace
-        text = ' '.join(text.split())
+        results = await asyncio.gather(
+            *[process_bounded(file_path) for file_path in file_paths],
+            return_exceptions=True
+        )
         
-        return text.strip()
+        return [path for path in results if isinstance(path, str)]
 
 # For testing purposes
 async def main():
@@ -187,4 +199,5 @@ async def main():
     logger.info(f"Processed {len(processed_files)} files")
 
 if __name__ == "__main__":
+    setup_logging()
     asyncio.run(main())
\ No newline at end of file
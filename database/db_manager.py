@@ -1,35 +1,311 @@
 import aiomysql
+import asyncio
+import functools
 import logging
+import os
+import re
+import tempfile
+import time
+from pymysql.constants import ER
+from collections import defaultdict
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-import json
 
 from config import DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger('db_manager')
 
+# Connection settings shared by the pool and the dedicated bulk-load connections
+DB_CONNECT_ARGS = {
+    'host': DB_HOST,
+    'port': DB_PORT,
+    'user': DB_USER,
+    'password': DB_PASSWORD,
+    'db': DB_NAME,
+    'autocommit': True,
+    'charset': 'utf8mb4'
+}
+
+# Connections opened when the pool is created, and the most it will hold;
+# size DB_POOL_MAXSIZE to the number of queries expected in flight
+DB_POOL_MINSIZE = int(os.getenv("DB_POOL_MINSIZE", 4))
+DB_POOL_MAXSIZE = int(os.getenv("DB_POOL_MAXSIZE", 32))
+
+# Seconds after which idle connections are replaced, ahead of the server's wait_timeout
+DB_POOL_RECYCLE = 3600
+
+# Seconds the metadata lists (types, agencies, topics) are served from memory
+METADATA_CACHE_TTL = 300
+
+# Values per IN (...) list when looking up rows for a batch
+IN_CLAUSE_CHUNK_SIZE = 1000
+
+# Errors caused by the values of one row; a batch failing with one is split until
+# the offending rows are isolated and skipped
+ROW_ERROR_CODES = frozenset({
+    ER.BAD_NULL_ERROR,
+    ER.WARN_DATA_OUT_OF_RANGE,
+    ER.WARN_DATA_TRUNCATED,
+    ER.TRUNCATED_WRONG_VALUE,
+    ER.TRUNCATED_WRONG_VALUE_FOR_FIELD,
+    ER.DATA_TOO_LONG
+})
+
+# Batches with more rows than this are sent with LOAD DATA LOCAL INFILE rather than
+# multi-row INSERTs. Off (0) unless set: the server must allow local_infile, which
+# MySQL 8 disables by default.
+BULK_LOAD_THRESHOLD = int(os.getenv("DB_BULK_LOAD_THRESHOLD", 0))
+
+# Errors meaning the server refuses LOAD DATA LOCAL INFILE (ER_NOT_ALLOWED_COMMAND,
+# ER_CLIENT_LOCAL_FILES_DISABLED); such batches fall back to multi-row INSERTs
+LOCAL_INFILE_REJECTED_CODES = frozenset({ER.NOT_ALLOWED_COMMAND, 3948})
+
+# Secondary indexes on documents for the search filters and ordering
+DOCUMENT_INDEXES = {
+    'idx_documents_pubdate': 'publication_date DESC',
+    'idx_documents_doctype_pubdate': 'document_type, publication_date DESC',
+    'idx_documents_presdoctype': 'presidential_document_type',
+    'idx_documents_eo': 'executive_order_number'
+}
+
+# Executive order numbers are short identifiers matched exactly, so they are stored
+# narrow and compared byte-wise rather than with Unicode collation rules
+EXECUTIVE_ORDER_NUMBER_TYPE_SQL = "VARCHAR(20) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin"
+
+# FULLTEXT index backing keyword search
+FULLTEXT_INDEX_NAME = 'ft_title_abstract'
+
+# InnoDB ignores words shorter than innodb_ft_min_token_size (default 3) in FULLTEXT searches
+FULLTEXT_MIN_TOKEN_SIZE = 3
+
+# InnoDB's default FULLTEXT stopwords (information_schema.INNODB_FT_DEFAULT_STOPWORD),
+# which the index never matches
+FULLTEXT_STOPWORDS = frozenset({
+    'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en', 'for',
+    'from', 'how', 'i', 'in', 'is', 'it', 'la', 'of', 'on', 'or', 'that', 'the',
+    'this', 'to', 'was', 'what', 'when', 'where', 'who', 'will', 'with', 'und', 'www'
+})
+
+# Tables created by _initialize_db_schema
+SCHEMA_TABLES = ('documents', 'agencies', 'topics', 'document_agencies', 'document_topics')
+
+# Counts the schema's tables and the documents indexes, and checks the executive
+# order number column type, in one round-trip
+SCHEMA_PROBE_SQL = f"""
+    SELECT
+        (SELECT COUNT(*) FROM information_schema.tables
+         WHERE table_schema = DATABASE() AND table_name IN ({", ".join(["%s"] * len(SCHEMA_TABLES))})),
+        (SELECT COUNT(DISTINCT index_name) FROM information_schema.statistics
+         WHERE table_schema = DATABASE() AND table_name = 'documents'
+         AND index_name IN ({", ".join(["%s"] * (len(DOCUMENT_INDEXES) + 1))})),
+        (SELECT COUNT(*) FROM information_schema.columns
+         WHERE table_schema = DATABASE() AND table_name = 'documents'
+         AND column_name = 'executive_order_number'
+         AND character_maximum_length = 20 AND collation_name = 'utf8mb4_bin')
+"""
+
+# Loads a tab-separated file, written with LOAD DATA's default escaping, into {table}
+LOAD_DATA_SQL = """
+    LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE {table}
+    CHARACTER SET utf8mb4
+    FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n'
+    ({columns})
+"""
+
+# Document columns written by store_documents, in row order
+DOCUMENT_WRITE_COLUMNS_SQL = """
+    document_number, document_type, title, publication_date,
+    abstract, html_url, pdf_url, full_text_xml_url,
+    presidential_document_type, signing_date, executive_order_number
+"""
+
+# Upsert used by store_documents; executemany sends it as multi-row INSERTs
+UPSERT_DOCUMENT_SQL = f"""
+    INSERT INTO documents ({DOCUMENT_WRITE_COLUMNS_SQL})
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        document_type = VALUES(document_type),
+        title = VALUES(title),
+        publication_date = VALUES(publication_date),
+        abstract = VALUES(abstract),
+        html_url = VALUES(html_url),
+        pdf_url = VALUES(pdf_url),
+        full_text_xml_url = VALUES(full_text_xml_url),
+        presidential_document_type = VALUES(presidential_document_type),
+        signing_date = VALUES(signing_date),
+        executive_order_number = VALUES(executive_order_number),
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+# Bulk path: rows are loaded into a temporary staging table on the bulk connection,
+# with the documents column types but no indexes, then upserted from it with the
+# same update clause
+CREATE_DOCUMENT_STAGING_SQL = f"""
+    CREATE TEMPORARY TABLE documents_staging
+    SELECT {DOCUMENT_WRITE_COLUMNS_SQL} FROM documents LIMIT 0
+"""
+LOAD_DOCUMENT_STAGING_SQL = LOAD_DATA_SQL.format(table='documents_staging', columns=DOCUMENT_WRITE_COLUMNS_SQL)
+UPSERT_STAGED_DOCUMENTS_SQL = UPSERT_DOCUMENT_SQL.replace(
+    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+    f"SELECT {DOCUMENT_WRITE_COLUMNS_SQL} FROM documents_staging"
+)
+
+# Statements taking an IN list have {} filled with one placeholder per value
+SELECT_DOCUMENT_IDS_SQL = "SELECT id, document_number FROM documents WHERE document_number IN ({})"
+
+# Statements for each many-to-many relation, keyed by the document field holding the names
+RELATION_SQL = {
+    'agencies': {
+        'insert_names': "INSERT IGNORE INTO agencies (agency_name) VALUES (%s)",
+        'select_ids': "SELECT id, agency_name FROM agencies WHERE agency_name IN ({})",
+        'select_id': "SELECT id FROM agencies WHERE agency_name = %s",
+        'insert_links': "INSERT IGNORE INTO document_agencies (document_id, agency_id) VALUES (%s, %s)",
+        'load_links': LOAD_DATA_SQL.format(table='document_agencies', columns='document_id, agency_id'),
+        'delete_links': "DELETE FROM document_agencies WHERE document_id IN ({})",
+        'select_names': """
+            SELECT da.document_id, a.agency_name AS name
+            FROM document_agencies da
+            JOIN agencies a ON a.id = da.agency_id
+            WHERE da.document_id IN ({})
+        """
+    },
+    'topics': {
+        'insert_names': "INSERT IGNORE INTO topics (topic_name) VALUES (%s)",
+        'select_ids': "SELECT id, topic_name FROM topics WHERE topic_name IN ({})",
+        'select_id': "SELECT id FROM topics WHERE topic_name = %s",
+        'insert_links': "INSERT IGNORE INTO document_topics (document_id, topic_id) VALUES (%s, %s)",
+        'load_links': LOAD_DATA_SQL.format(table='document_topics', columns='document_id, topic_id'),
+        'delete_links': "DELETE FROM document_topics WHERE document_id IN ({})",
+        'select_names': """
+            SELECT dt.document_id, t.topic_name AS name
+            FROM document_topics dt
+            JOIN topics t ON t.id = dt.topic_id
+            WHERE dt.document_id IN ({})
+        """
+    }
+}
+
+# Rows per fetchmany when streaming large result sets from a server-side cursor
+STREAM_FETCH_SIZE = 500
+
+# Result sets larger than this are streamed instead of fetched in one go
+STREAM_LIMIT_THRESHOLD = 500
+
+# Document columns returned to callers, with dates formatted as ISO strings by the
+# server; '%%' because these statements always run with parameters. List views
+# get the summary; the full projection adds the abstract, links and timestamps.
+DOCUMENT_SUMMARY_COLUMNS_SQL = """
+    d.id, d.document_number, d.document_type, d.title,
+    DATE_FORMAT(d.publication_date, '%%Y-%%m-%%d') AS publication_date,
+    d.executive_order_number, d.presidential_document_type
+"""
+DOCUMENT_COLUMNS_SQL = DOCUMENT_SUMMARY_COLUMNS_SQL + """,
+    d.abstract, d.html_url, d.pdf_url, d.full_text_xml_url,
+    DATE_FORMAT(d.signing_date, '%%Y-%%m-%%d') AS signing_date,
+    DATE_FORMAT(d.created_at, '%%Y-%%m-%%dT%%H:%%i:%%s') AS created_at,
+    DATE_FORMAT(d.updated_at, '%%Y-%%m-%%dT%%H:%%i:%%s') AS updated_at
+"""
+
+def _like(value):
+    """Wrap a value for a substring LIKE match."""
+    return f"%{value}%"
+
+def _fulltext_terms(value):
+    """Return the words of a keyword string that the FULLTEXT index can match."""
+    return [
+        word for word in re.findall(r"\w+", value)
+        if len(word) >= FULLTEXT_MIN_TOKEN_SIZE and word.lower() not in FULLTEXT_STOPWORDS
+    ]
+
+def _all_terms(value):
+    """Build a BOOLEAN MODE search string requiring every indexable word."""
+    return " ".join(f"+{term}" for term in _fulltext_terms(value))
+
+# Search filters in the order they appear in the WHERE clause: key -> (clause, parameter builder).
+# 'keywords' requires every word, as the phrase LIKE it replaced effectively did;
+# 'keywords_like' is the fallback when no word is indexable.
+FILTER_CLAUSES = {
+    'date_from': ("d.publication_date >= %s", lambda value: (value,)),
+    'date_to': ("d.publication_date <= %s", lambda value: (value,)),
+    'document_type': ("d.document_type = %s", lambda value: (value,)),
+    'agency': ("""EXISTS (
+        SELECT 1 FROM document_agencies da JOIN agencies a ON a.id = da.agency_id
+        WHERE da.document_id = d.id AND a.agency_name LIKE %s
+    )""", lambda value: (_like(value),)),
+    'topic': ("""EXISTS (
+        SELECT 1 FROM document_topics dt JOIN topics t ON t.id = dt.topic_id
+        WHERE dt.document_id = d.id AND t.topic_name LIKE %s
+    )""", lambda value: (_like(value),)),
+    'presidential_doc_type': ("d.presidential_document_type LIKE %s", lambda value: (_like(value),)),
+    'keywords': ("MATCH(d.title, d.abstract) AGAINST (%s IN BOOLEAN MODE)", lambda value: (_all_terms(value),)),
+    'keywords_like': ("(d.title LIKE %s OR d.abstract LIKE %s)", lambda value: (_like(value), _like(value))),
+    'executive_order': ("d.executive_order_number = %s", lambda value: (value,))
+}
+
+@functools.lru_cache(maxsize=None)
+def _search_sql(filter_keys, include_body):
+    """
+    Render the search statement for a combination of filters.
+    
+    Args:
+        filter_keys: Tuple of applied FILTER_CLAUSES keys, in FILTER_CLAUSES order
+        include_body: Whether to select the full projection rather than the summary
+        
+    Returns:
+        SQL with placeholders for the filter parameters, then limit and offset
+    """
+    where = " AND ".join(FILTER_CLAUSES[key][0] for key in filter_keys) or "1=1"
+    columns = DOCUMENT_COLUMNS_SQL if include_body else DOCUMENT_SUMMARY_COLUMNS_SQL
+    
+    # Agency and topic filters are EXISTS semi-joins, so each document appears
+    # once without DISTINCT and the ordering can come from the date index
+    return f"""
+        SELECT {columns}
+        FROM documents d
+        WHERE {where}
+        ORDER BY d.publication_date DESC
+        LIMIT %s OFFSET %s
+    """
+
+def _chunks(items, size):
+    """Yield successive slices of at most size items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _placeholders(count):
+    """Return a comma-separated list of count %s placeholders."""
+    return ", ".join(["%s"] * count)
+
+# Characters LOAD DATA reads as escape sequences by default
+_TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+
+def _write_tsv(rows):
+    """Write rows to a temporary tab-separated file for LOAD DATA; runs in a worker thread."""
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', suffix='.tsv', delete=False) as f:
+        for row in rows:
+            f.write("\t".join("\\N" if value is None else str(value).translate(_TSV_ESCAPES) for value in row))
+            f.write("\n")
+    return f.name
+
 class DatabaseManager:
     """Manages database connections and operations."""
     
     def __init__(self):
         self.pool = None
+        # Name as spelled in the documents -> id for each relation, kept across batches
+        self._name_ids = {relation: {} for relation in RELATION_SQL}
+        # Metadata list name -> (expiry, value)
+        self._cache = {}
         
     async def connect(self):
         """Establish connection to the MySQL database."""
         try:
             self.pool = await aiomysql.create_pool(
-                host=DB_HOST,
-                port=DB_PORT,
-                user=DB_USER,
-                password=DB_PASSWORD,
-                db=DB_NAME,
-                autocommit=True,
-                charset='utf8mb4',
+                **DB_CONNECT_ARGS,
+                # The minimum is opened up front, so requests never wait on a handshake
+                minsize=DB_POOL_MINSIZE,
+                maxsize=max(DB_POOL_MAXSIZE, DB_POOL_MINSIZE),
+                pool_recycle=DB_POOL_RECYCLE,
                 cursorclass=aiomysql.DictCursor
             )
             logger.info("Successfully connected to the database")
@@ -39,6 +315,8 @@ class DatabaseManager:
             
         except Exception as e:
             logger.error(f"Error connecting to database: {str(e)}")
+            # Leave no half-initialized pool behind for the next attempt
+            await self.close()
             raise
     
     async def close(self):
@@ -46,14 +324,23 @@ class DatabaseManager:
         if self.pool:
             self.pool.close()
             await self.pool.wait_closed()
+            self.pool = None
             logger.info("Database connection closed")
     
     async def _initialize_db_schema(self):
         """Initialize database schema if it doesn't exist."""
         async with self.pool.acquire() as conn:
-            async with conn.cursor() as cursor:
+            async with conn.cursor(aiomysql.Cursor) as cursor:
+                # A single probe replaces a DDL round-trip per table and index when the schema is in place
+                index_names = (*DOCUMENT_INDEXES, FULLTEXT_INDEX_NAME)
+                await cursor.execute(SCHEMA_PROBE_SQL, SCHEMA_TABLES + index_names)
+                table_count, index_count, eo_column_current = await cursor.fetchone()
+                if (table_count, index_count, eo_column_current) == (len(SCHEMA_TABLES), len(index_names), 1):
+                    logger.info("Database schema is up to date")
+                    return
+                
                 # Create documents table
-                await cursor.execute("""
+                await cursor.execute(f"""
                     CREATE TABLE IF NOT EXISTS documents (
                         id INT AUTO_INCREMENT PRIMARY KEY,
                         document_number VARCHAR(100) UNIQUE,
@@ -66,7 +353,7 @@ class DatabaseManager:
                         full_text_xml_url VARCHAR(500),
                         presidential_document_type VARCHAR(100),
                         signing_date DATE,
-                        executive_order_number VARCHAR(50),
+                        executive_order_number {EXECUTIVE_ORDER_NUMBER_TYPE_SQL},
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
                     )
@@ -112,150 +399,370 @@ class DatabaseManager:
                     )
                 """)
                 
+                # Tables created before the column was narrowed are migrated in place
+                if not eo_column_current:
+                    await cursor.execute(
+                        f"ALTER TABLE documents MODIFY executive_order_number {EXECUTIVE_ORDER_NUMBER_TYPE_SQL}"
+                    )
+                
+                # Create search indexes
+                for index_name, columns in DOCUMENT_INDEXES.items():
+                    await self._ensure_index(cursor, 'documents', index_name, columns)
+                await self._ensure_index(cursor, 'documents', FULLTEXT_INDEX_NAME, 'title, abstract', fulltext=True)
+                
                 logger.info("Database schema initialized")
     
+    async def _ensure_index(self, cursor, table, index_name, columns, fulltext=False):
+        """
+        Create an index unless it already exists.
+        
+        MySQL has no CREATE INDEX IF NOT EXISTS, so information_schema is checked first.
+        
+        Args:
+            cursor: Cursor to run the statements on
+            table: Table to index
+            index_name: Name of the index
+            columns: Column list of the index, as SQL
+            fulltext: Whether to create a FULLTEXT index
+        """
+        await cursor.execute("""
+            SELECT 1 FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+            LIMIT 1
+        """, (table, index_name))
+        if not await cursor.fetchone():
+            index_kind = "FULLTEXT INDEX" if fulltext else "INDEX"
+            await cursor.execute(f"CREATE {index_kind} {index_name} ON {table} ({columns})")
+    
+    async def _select_ids(self, cursor, sql, keys):
+        """
+        Map key values to row ids, querying in IN-list chunks.
+        
+        Args:
+            cursor: Tuple cursor to run the queries on
+            sql: Statement selecting (id, key) rows, with {} for the IN list
+            keys: List of key values
+            
+        Returns:
+            Dictionary mapping each found key to its id
+        """
+        ids = {}
+        for chunk in _chunks(keys, IN_CLAUSE_CHUNK_SIZE):
+            await cursor.execute(sql.format(_placeholders(len(chunk))), chunk)
+            ids.update((key, row_id) for row_id, key in await cursor.fetchall())
+        return ids
+    
+    async def _load_rows(self, cursor, sql, rows):
+        """
+        Send rows to the server with LOAD DATA LOCAL INFILE.
+        
+        Args:
+            cursor: Cursor to run the statement on
+            sql: LOAD DATA statement with a placeholder for the file name
+            rows: Sequence of row tuples in the statement's column order
+            
+        Returns:
+            Number of rows loaded
+        """
+        path = await asyncio.to_thread(_write_tsv, rows)
+        try:
+            return await cursor.execute(sql, (path,))
+        finally:
+            os.unlink(path)
+    
+    async def _store_links(self, cursor, documents, document_ids, relation, bulk):
+        """
+        Store the names a batch of documents refers to and link them to the documents.
+        
+        Args:
+            cursor: Tuple cursor to run the statements on
+            documents: List of document dictionaries
+            document_ids: Dictionary mapping document_number to document id
+            relation: Document field holding the names ('agencies' or 'topics')
+            bulk: Whether large link sets may be sent with LOAD DATA LOCAL INFILE
+            
+        Returns:
+            True if the batch referred to names not seen before
+        """
+        statements = RELATION_SQL[relation]
+        
+        # Keyed by the names as the documents spell them
+        name_ids = self._name_ids[relation]
+        
+        # Only names not seen in an earlier batch need a round-trip
+        missing = list({
+            name for doc in documents for name in doc.get(relation) or []
+            if name and name not in name_ids
+        })
+        if missing:
+            # executemany folds these into multi-row INSERTs sized below max_allowed_packet
+            await cursor.executemany(statements['insert_names'], [(name,) for name in missing])
+            found = await self._select_ids(cursor, statements['select_ids'], missing)
+            
+            for name in missing:
+                if name in found:
+                    name_ids[name] = found[name]
+                    continue
+                
+                # The column's collation ignores case and accents, so the IGNOREd insert
+                # may have matched a row stored with another spelling; look that row up
+                await cursor.execute(statements['select_id'], (name,))
+                row = await cursor.fetchone()
+                if row:
+                    name_ids[name] = row[0]
+                else:
+                    logger.warning("No %s row found for %r; its links were not stored", relation, name)
+        
+        links = {
+            (document_ids[doc['document_number']], name_ids[name])
+            for doc in documents
+            for name in doc.get(relation) or []
+            if name in name_ids
+        }
+        # Primary key order keeps the inserts appending to the clustered index
+        if bulk and len(links) > BULK_LOAD_THRESHOLD:
+            await self._load_rows(cursor, statements['load_links'], sorted(links))
+        elif links:
+            # INSERT IGNORE matches aiomysql's multi-row rewrite, which also splits the
+            # statement below max_allowed_packet
+            await cursor.executemany(statements['insert_links'], sorted(links))
+        
+        return bool(missing)
+    
     async def store_documents(self, documents: List[Dict[str, Any]]) -> int:
         """
         Store documents in the database.
         
+        The whole batch is written with a handful of multi-row statements:
+        one upsert for the documents, then one insert per lookup table and
+        per link table. Batches above BULK_LOAD_THRESHOLD load the documents
+        and links with LOAD DATA LOCAL INFILE instead. Documents MySQL rejects
+        are skipped without losing the rest of the batch.
+        
         Args:
             documents: List of document dictionaries
             
         Returns:
-            Number of documents stored
+            Number of new documents stored
         """
         if not self.pool:
             await self.connect()
         
-        documents_stored = 0
+        # One row per document_number, the last occurrence winning
+        documents = list({
+            doc['document_number']: doc for doc in documents if doc.get('document_number')
+        }.values())
+        if not documents:
+            return 0
         
-        async with self.pool.acquire() as conn:
-            async with conn.cursor() as cursor:
-                for doc in documents:
-                    try:
-                        # Format dates
-                        publication_date = doc.get('publication_date')
-                        signing_date = doc.get('signing_date')
-                        
-                        # Skip if document is already in the database
-                        await cursor.execute(
-                            "SELECT id FROM documents WHERE document_number = %s",
-                            (doc.get('document_number'),)
+        return await self._store_isolating_errors(documents, 0 < BULK_LOAD_THRESHOLD < len(documents))
+    
+    async def _store_isolating_errors(self, documents, bulk):
+        """
+        Write documents, halving the batch on row-level errors to skip only the failing rows.
+        
+        Args:
+            documents: List of document dictionaries, unique by document_number
+            bulk: Whether to write with LOAD DATA LOCAL INFILE
+            
+        Returns:
+            Number of new documents stored
+        """
+        try:
+            return await self._write_documents(documents, bulk)
+        except aiomysql.MySQLError as e:
+            code = e.args[0] if e.args else None
+            if bulk and code in LOCAL_INFILE_REJECTED_CODES:
+                logger.warning("Server rejected LOAD DATA LOCAL INFILE, using multi-row inserts: %s", e)
+                return await self._store_isolating_errors(documents, False)
+            
+            if code not in ROW_ERROR_CODES:
+                raise
+            
+            if len(documents) == 1:
+                logger.warning("Skipping document %s: %s", documents[0]['document_number'], e)
+                return 0
+            
+            # The halves always go through the row upsert, which fails on bad values rather than truncating them
+            logger.debug("Batch of %s documents rejected, retrying in halves: %s", len(documents), e)
+            middle = len(documents) // 2
+            return (
+                await self._store_isolating_errors(documents[:middle], False)
+                + await self._store_isolating_errors(documents[middle:], False)
+            )
+    
+    async def _write_documents(self, documents, bulk):
+        """
+        Write a batch of documents and their relations in one transaction.
+        
+        Args:
+            documents: List of document dictionaries, unique by document_number
+            bulk: Whether to write with LOAD DATA LOCAL INFILE
+            
+        Returns:
+            Number of new documents stored
+        """
+        document_numbers = [doc['document_number'] for doc in documents]
+        
+        rows = [
+            (
+                doc['document_number'],
+                doc.get('type'),
+                doc.get('title'),
+                doc.get('publication_date'),
+                doc.get('abstract'),
+                doc.get('html_url'),
+                doc.get('pdf_url'),
+                doc.get('full_text_xml_url'),
+                doc.get('presidential_document_type'),
+                doc.get('signing_date'),
+                doc.get('executive_order_number')
+            )
+            for doc in documents
+        ]
+        
+        # LOCAL INFILE lets the server read files from this host, so it is only enabled
+        # on a connection opened for the bulk write, never on the pool serving queries
+        connection = aiomysql.connect(**DB_CONNECT_ARGS, local_infile=True) if bulk else self.pool.acquire()
+        
+        async with connection as conn:
+            async with conn.cursor(aiomysql.Cursor) as cursor:
+                # The staging table is private to this connection, so it is filled outside the transaction
+                if bulk:
+                    await cursor.execute(CREATE_DOCUMENT_STAGING_SQL)
+                    await self._load_rows(cursor, LOAD_DOCUMENT_STAGING_SQL, rows)
+                    
+                    # LOAD DATA LOCAL turns bad values into warnings and stores them truncated;
+                    # fail instead, so these rows are isolated like on the row upsert path
+                    await cursor.execute("SELECT @@warning_count")
+                    (warning_count,) = await cursor.fetchone()
+                    if warning_count:
+                        raise aiomysql.DataError(
+                            ER.WARN_DATA_TRUNCATED, f"LOAD DATA reported {warning_count} warnings"
                         )
-                        existing_doc = await cursor.fetchone()
-                        
-                        if existing_doc:
-                            # Update existing document
-                            await cursor.execute("""
-                                UPDATE documents SET
-                                    document_type = %s,
-                                    title = %s,
-                                    publication_date = %s,
-                                    abstract = %s,
-                                    html_url = %s,
-                                    pdf_url = %s,
-                                    full_text_xml_url = %s,
-                                    presidential_document_type = %s,
-                                    signing_date = %s,
-                                    executive_order_number = %s,
-                                    updated_at = CURRENT_TIMESTAMP
-                                WHERE document_number = %s
-                            """, (
-                                doc.get('type'),  # Changed from document_type to type to match processor output
-                                doc.get('title'),
-                                publication_date,
-                                doc.get('abstract'),
-                                doc.get('html_url'),
-                                doc.get('pdf_url'),
-                                doc.get('full_text_xml_url'),
-                                doc.get('presidential_document_type'),
-                                signing_date,
-                                doc.get('executive_order_number'),
-                                doc.get('document_number')
-                            ))
-                            
-                            document_id = existing_doc[0]
-                            
-                            # Clear existing agency and topic associations
-                            await cursor.execute("DELETE FROM document_agencies WHERE document_id = %s", (document_id,))
-                            await cursor.execute("DELETE FROM document_topics WHERE document_id = %s", (document_id,))
-                        else:
-                            # Insert new document
-                            await cursor.execute("""
-                                INSERT INTO documents (
-                                    document_number, document_type, title, publication_date,
-                                    abstract, html_url, pdf_url, full_text_xml_url,
-                                    presidential_document_type, signing_date, executive_order_number,
-                                    created_at, updated_at
-                                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                            """, (
-                                doc.get('document_number'),
-                                doc.get('type'),  # Changed from document_type to type to match processor output
-                                doc.get('title'),
-                                publication_date,
-                                doc.get('abstract'),
-                                doc.get('html_url'),
-                                doc.get('pdf_url'),
-                                doc.get('full_text_xml_url'),
-                                doc.get('presidential_document_type'),
-                                signing_date,
-                                doc.get('executive_order_number')
-                            ))
-                            
-                            document_id = cursor.lastrowid
-                            documents_stored += 1
-                        
-                        # Process agencies
-                        for agency_name in doc.get('agencies', []):  # Changed from agency_names to agencies to match processor output
-                            if agency_name:
-                                # Insert agency if it doesn't exist
-                                await cursor.execute(
-                                    "INSERT IGNORE INTO agencies (agency_name) VALUES (%s)",
-                                    (agency_name,)
-                                )
-                                
-                                # Get agency ID
-                                await cursor.execute(
-                                    "SELECT id FROM agencies WHERE agency_name = %s",
-                                    (agency_name,)
-                                )
-                                agency_id = (await cursor.fetchone())[0]
-                                
-                                # Associate document with agency
-                                await cursor.execute(
-                                    "INSERT IGNORE INTO document_agencies (document_id, agency_id) VALUES (%s, %s)",
-                                    (document_id, agency_id)
-                                )
-                        
-                        # Process topics
-                        for topic_name in doc.get('topics', []):
-                            if topic_name:
-                                # Insert topic if it doesn't exist
-                                await cursor.execute(
-                                    "INSERT IGNORE INTO topics (topic_name) VALUES (%s)",
-                                    (topic_name,)
-                                )
-                                
-                                # Get topic ID
-                                await cursor.execute(
-                                    "SELECT id FROM topics WHERE topic_name = %s",
-                                    (topic_name,)
-                                )
-                                topic_id = (await cursor.fetchone())[0]
-                                
-                                # Associate document with topic
-                                await cursor.execute(
-                                    "INSERT IGNORE INTO document_topics (document_id, topic_id) VALUES (%s, %s)",
-                                    (document_id, topic_id)
-                                )
-                        
-                    except Exception as e:
-                        logger.error(f"Error storing document {doc.get('document_number')}: {str(e)}")
-                        # Log the full document for debugging
-                        logger.debug(f"Problematic document: {json.dumps(doc, indent=2)}")
-                        continue
-        
-        return documents_stored
+                
+                # One transaction per batch, so InnoDB flushes its log once rather than per statement
+                await conn.begin()
+                try:
+                    # Documents already stored are counted before the upsert; affected-row
+                    # counts can't tell inserts apart from unchanged rows reliably
+                    document_ids = await self._select_ids(cursor, SELECT_DOCUMENT_IDS_SQL, document_numbers)
+                    new_numbers = [number for number in document_numbers if number not in document_ids]
+                    existing_ids = list(document_ids.values())
+                    
+                    if bulk:
+                        await cursor.execute(UPSERT_STAGED_DOCUMENTS_SQL)
+                    else:
+                        await cursor.executemany(UPSERT_DOCUMENT_SQL, rows)
+                    
+                    # Only the inserted documents still need their ids looked up
+                    if new_numbers:
+                        document_ids.update(await self._select_ids(cursor, SELECT_DOCUMENT_IDS_SQL, new_numbers))
+                    
+                    # Clear the associations of documents that already existed; inserted ones have none
+                    for chunk in _chunks(existing_ids, IN_CLAUSE_CHUNK_SIZE):
+                        for statements in RELATION_SQL.values():
+                            await cursor.execute(statements['delete_links'].format(_placeholders(len(chunk))), chunk)
+                    
+                    new_names = [
+                        relation for relation in RELATION_SQL
+                        if await self._store_links(cursor, documents, document_ids, relation, bulk)
+                    ]
+                    await conn.commit()
+                except Exception:
+                    await conn.rollback()
+                    # Names inserted in the rolled-back transaction may have been cached
+                    for name_ids in self._name_ids.values():
+                        name_ids.clear()
+                    raise
+        
+        # Stored documents may carry new types; new names change the agency/topic lists
+        self._cache.pop('document_types', None)
+        self._cache.pop('presidential_document_types', None)
+        for relation in new_names:
+            self._cache.pop(relation, None)
+        
+        return len(new_numbers)
+    
+    async def _fetch_relation(self, relation, ids):
+        """
+        Fetch the names of one relation for a set of documents on a dedicated connection.
+        
+        Args:
+            relation: Relation to fetch ('agencies' or 'topics')
+            ids: List of document ids
+            
+        Returns:
+            Dictionary mapping document id to its list of names
+        """
+        names = defaultdict(list)
+        async with self.pool.acquire() as conn:
+            async with conn.cursor(aiomysql.Cursor) as cursor:
+                await cursor.execute(RELATION_SQL[relation]['select_names'].format(_placeholders(len(ids))), ids)
+                for document_id, name in await cursor.fetchall():
+                    names[document_id].append(name)
+        return names
+    
+    async def _to_documents(self, description, rows):
+        """
+        Build document dictionaries from tuple rows, with agency and topic names attached.
+        
+        Each relation is one IN query, and the queries run concurrently on
+        separate pool connections. Every dictionary is built once, relations
+        included, rather than per row by the cursor and then extended.
+        
+        Args:
+            description: Cursor description of the rows, for the column names
+            rows: Sequence of row tuples whose first column is the document id
+            
+        Returns:
+            List of document dictionaries
+        """
+        if not rows:
+            return []
+        
+        ids = [row[0] for row in rows]
+        results = await asyncio.gather(*[self._fetch_relation(relation, ids) for relation in RELATION_SQL])
+        
+        keys = (*(column[0] for column in description), *RELATION_SQL)
+        return [
+            dict(zip(keys, (*row, *[names.get(row[0], []) for names in results])))
+            for row in rows
+        ]
+    
+    def _build_search_query(self, query_params: Dict[str, Any]):
+        """
+        Build the SQL and parameters for a document search.
+        
+        Args:
+            query_params: Dictionary of search parameters, as for search_documents
+            
+        Returns:
+            Tuple of (sql, params)
+        """
+        filter_keys = []
+        params = []
+        
+        for key, (_, build_params) in FILTER_CLAUSES.items():
+            value = query_params.get(key)
+            if not value:
+                continue
+            
+            # FULLTEXT ignores short words and stopwords; use LIKE when nothing else is left
+            if key == 'keywords' and not _fulltext_terms(value):
+                key = 'keywords_like'
+                build_params = FILTER_CLAUSES[key][1]
+            
+            filter_keys.append(key)
+            params.extend(build_params(value))
+        
+        # Add limit and offset
+        params.append(int(query_params.get('limit', 10)))
+        params.append(int(query_params.get('offset', 0)))
+        
+        sql = _search_sql(tuple(filter_keys), bool(query_params.get('include_body')))
+        
+        return sql, params
     
     async def search_documents(self, query_params: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -272,107 +779,55 @@ class DatabaseManager:
                 - keywords: Search in title and abstract
                 - limit: Maximum number of results to return
                 - offset: Offset for pagination
+                - include_body: Also return abstract, links, signing date and timestamps
                 
         Returns:
             List of matching documents
         """
         if not self.pool:
             await self.connect()
-            
-        # Build the SQL query
-        sql = """
-            SELECT DISTINCT d.*
-            FROM documents d
-            LEFT JOIN document_agencies da ON d.id = da.document_id
-            LEFT JOIN agencies a ON da.agency_id = a.id
-            LEFT JOIN document_topics dt ON d.id = dt.document_id
-            LEFT JOIN topics t ON dt.topic_id = t.id
-            WHERE 1=1
+        
+        sql, params = self._build_search_query(query_params)
+        
+        # Execute query
+        async with self.pool.acquire() as conn:
+            async with conn.cursor(aiomysql.Cursor) as cursor:
+                await cursor.execute(sql, params)
+                rows = await cursor.fetchall()
+                description = cursor.description
+        
+        # Fetch related agencies and topics for the whole page at once
+        return await self._to_documents(description, rows)
+    
+    async def stream_documents(self, query_params: Dict[str, Any]):
         """
-        params = []
+        Search for documents, yielding results in batches as the server sends them.
         
-        # Apply filters
-        if query_params.get('date_from'):
-            sql += " AND d.publication_date >= %s"
-            params.append(query_params['date_from'])
-            
-        if query_params.get('date_to'):
-            sql += " AND d.publication_date <= %s"
-            params.append(query_params['date_to'])
-            
-        if query_params.get('document_type'):
-            sql += " AND d.document_type = %s"
-            params.append(query_params['document_type'])
-            
-        if query_params.get('agency'):
-            sql += " AND a.agency_name LIKE %s"
-            params.append(f"%{query_params['agency']}%")
-            
-        if query_params.get('topic'):
-            sql += " AND t.topic_name LIKE %s"
-            params.append(f"%{query_params['topic']}%")
-            
-        if query_params.get('presidential_doc_type'):
-            sql += " AND d.presidential_document_type LIKE %s"
-            params.append(f"%{query_params['presidential_doc_type']}%")
-            
-        if query_params.get('keywords'):
-            keywords = query_params['keywords']
-            sql += " AND (d.title LIKE %s OR d.abstract LIKE %s)"
-            params.extend([f"%{keywords}%", f"%{keywords}%"])
-            
-        if query_params.get('executive_order'):
-            sql += " AND d.executive_order_number = %s"
-            params.append(query_params['executive_order'])
+        Rows are read through a server-side cursor, so memory stays bounded
+        by the batch size however large the limit. Relations are fetched on
+        other connections since the streaming one is busy until exhausted.
         
-        # Add order by
-        sql += " ORDER BY d.publication_date DESC"
+        Args:
+            query_params: Dictionary of search parameters, as for search_documents
+            
+        Yields:
+            Lists of up to STREAM_FETCH_SIZE matching documents
+        """
+        if not self.pool:
+            await self.connect()
         
-        # Add limit and offset
-        limit = int(query_params.get('limit', 10))
-        offset = int(query_params.get('offset', 0))
-        sql += " LIMIT %s OFFSET %s"
-        params.extend([limit, offset])
+        sql, params = self._build_search_query(query_params)
         
-        # Execute query
         async with self.pool.acquire() as conn:
-            async with conn.cursor(aiomysql.DictCursor) as cursor:
+            async with conn.cursor(aiomysql.SSCursor) as cursor:
                 await cursor.execute(sql, params)
-                documents = await cursor.fetchall()
                 
-                # For each document, fetch related agencies and topics
-                for doc in documents:
-                    # Fetch agencies
-                    await cursor.execute("""
-                        SELECT a.agency_name
-                        FROM agencies a
-                        JOIN document_agencies da ON a.id = da.agency_id
-                        WHERE da.document_id = %s
-                    """, (doc['id'],))
-                    agencies = await cursor.fetchall()
-                    doc['agencies'] = [a['agency_name'] for a in agencies]
-                    
-                    # Fetch topics
-                    await cursor.execute("""
-                        SELECT t.topic_name
-                        FROM topics t
-                        JOIN document_topics dt ON t.id = dt.topic_id
-                        WHERE dt.document_id = %s
-                    """, (doc['id'],))
-                    topics = await cursor.fetchall()
-                    doc['topics'] = [t['topic_name'] for t in topics]
+                while True:
+                    rows = await cursor.fetchmany(STREAM_FETCH_SIZE)
+                    if not rows:
+                        break
                     
-                    # Convert dates to string format for JSON serialization
-                    if doc.get('publication_date'):
-                        doc['publication_date'] = doc['publication_date'].isoformat()
-                    if doc.get('signing_date'):
-                        doc['signing_date'] = doc['signing_date'].isoformat()
-                    if doc.get('created_at'):
-                        doc['created_at'] = doc['created_at'].isoformat()
-                    if doc.get('updated_at'):
-                        doc['updated_at'] = doc['updated_at'].isoformat()
-                
-                return documents
+                    yield await self._to_documents(cursor.description, rows)
     
     async def get_document_by_id(self, document_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -388,57 +843,63 @@ class DatabaseManager:
             await self.connect()
             
         async with self.pool.acquire() as conn:
-            async with conn.cursor(aiomysql.DictCursor) as cursor:
-                await cursor.execute("SELECT * FROM documents WHERE id = %s", (document_id,))
-                document = await cursor.fetchone()
-                
-                if document:
-                    # Fetch agencies
-                    await cursor.execute("""
-                        SELECT a.agency_name
-                        FROM agencies a
-                        JOIN document_agencies da ON a.id = da.agency_id
-                        WHERE da.document_id = %s
-                    """, (document_id,))
-                    agencies = await cursor.fetchall()
-                    document['agencies'] = [a['agency_name'] for a in agencies]
-                    
-                    # Fetch topics
-                    await cursor.execute("""
-                        SELECT t.topic_name
-                        FROM topics t
-                        JOIN document_topics dt ON t.id = dt.topic_id
-                        WHERE dt.document_id = %s
-                    """, (document_id,))
-                    topics = await cursor.fetchall()
-                    document['topics'] = [t['topic_name'] for t in topics]
-                    
-                    # Convert dates to string format for JSON serialization
-                    if document.get('publication_date'):
-                        document['publication_date'] = document['publication_date'].isoformat()
-                    if document.get('signing_date'):
-                        document['signing_date'] = document['signing_date'].isoformat()
-                    if document.get('created_at'):
-                        document['created_at'] = document['created_at'].isoformat()
-                    if document.get('updated_at'):
-                        document['updated_at'] = document['updated_at'].isoformat()
-                
-                return document
+            async with conn.cursor(aiomysql.Cursor) as cursor:
+                await cursor.execute(
+                    f"SELECT {DOCUMENT_COLUMNS_SQL} FROM documents d WHERE d.id = %s",
+                    (document_id,)
+                )
+                row = await cursor.fetchone()
+                description = cursor.description
+        
+        if row is None:
+            return None
+        
+        return (await self._to_documents(description, [row]))[0]
     
-    async def get_recent_documents(self, limit: int = 10) -> List[Dict[str, Any]]:
+    async def get_recent_documents(self, limit: int = 10, include_body: bool = False) -> List[Dict[str, Any]]:
         """
         Get the most recent documents.
         
         Args:
             limit: Maximum number of documents to return
+            include_body: Also return abstract, links, signing date and timestamps
             
         Returns:
             List of document dictionaries
         """
-        return await self.search_documents({
+        query_params = {
             'limit': limit,
-            'offset': 0
-        })
+            'offset': 0,
+            'include_body': include_body
+        }
+        
+        # Large exports are streamed so the driver never buffers the whole result
+        if limit > STREAM_LIMIT_THRESHOLD:
+            documents = []
+            async for batch in self.stream_documents(query_params):
+                documents.extend(batch)
+            return documents
+        
+        return await self.search_documents(query_params)
+    
+    async def _cached(self, key, loader):
+        """
+        Return a metadata list from memory, calling loader on a miss or expiry.
+        
+        Args:
+            key: Cache key
+            loader: Zero-argument coroutine function producing the value
+            
+        Returns:
+            Cached or freshly loaded value
+        """
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        
+        value = await loader()
+        self._cache[key] = (time.monotonic() + METADATA_CACHE_TTL, value)
+        return value
     
     async def get_document_types(self) -> List[str]:
         """
@@ -447,11 +908,15 @@ class DatabaseManager:
         Returns:
             List of document type strings
         """
+        return await self._cached('document_types', self._load_document_types)
+    
+    async def _load_document_types(self) -> List[str]:
+        """Query all document types."""
         if not self.pool:
             await self.connect()
             
         async with self.pool.acquire() as conn:
-            async with conn.cursor() as cursor:
+            async with conn.cursor(aiomysql.Cursor) as cursor:
                 await cursor.execute("SELECT DISTINCT document_type FROM documents")
                 types = await cursor.fetchall()
                 return [t[0] for t in types if t[0]]
@@ -463,11 +928,15 @@ class DatabaseManager:
         Returns:
             List of agency name strings
         """
+        return await self._cached('agencies', self._load_agencies)
+    
+    async def _load_agencies(self) -> List[str]:
+        """Query all agency names."""
         if not self.pool:
             await self.connect()
             
         async with self.pool.acquire() as conn:
-            async with conn.cursor() as cursor:
+            async with conn.cursor(aiomysql.Cursor) as cursor:
                 await cursor.execute("SELECT agency_name FROM agencies ORDER BY agency_name")
                 agencies = await cursor.fetchall()
                 return [a[0] for a in agencies if a[0]]
@@ -479,11 +948,15 @@ class DatabaseManager:
         Returns:
             List of topic name strings
         """
+        return await self._cached('topics', self._load_topics)
+    
+    async def _load_topics(self) -> List[str]:
+        """Query all topic names."""
         if not self.pool:
             await self.connect()
             
         async with self.pool.acquire() as conn:
-            async with conn.cursor() as cursor:
+            async with conn.cursor(aiomysql.Cursor) as cursor:
                 await cursor.execute("SELECT topic_name FROM topics ORDER BY topic_name")
                 topics = await cursor.fetchall()
                 return [t[0] for t in topics if t[0]]
@@ -495,11 +968,15 @@ class DatabaseManager:
         Returns:
             List of presidential document type strings
         """
+        return await self._cached('presidential_document_types', self._load_presidential_document_types)
+    
+    async def _load_presidential_document_types(self) -> List[str]:
+        """Query all presidential document types."""
         if not self.pool:
             await self.connect()
             
         async with self.pool.acquire() as conn:
-            async with conn.cursor() as cursor:
+            async with conn.cursor(aiomysql.Cursor) as cursor:
                 await cursor.execute(
                     "SELECT DISTINCT presidential_document_type FROM documents WHERE presidential_document_type IS NOT NULL"
                 )
@@ -0,0 +1,15 @@
+import logging
+
+# Shared by every entry point so all modules log in the same format
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+def setup_logging(level=logging.INFO):
+    """
+    Configure root logging once for the process.
+    
+    Library modules only create their own loggers; entry points call this.
+    
+    Args:
+        level: Root logging level
+    """
+    logging.basicConfig(level=level, format=LOG_FORMAT)
@@ -4,18 +4,15 @@ import logging
 
 from data_pipeline.pipeline import FederalRegistryPipeline
 from api.main import start as start_api
+from logging_setup import setup_logging
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+setup_logging()
 logger = logging.getLogger('main')
 
 async def run_pipeline(days_to_fetch: int):
     """Run the data pipeline."""
-    pipeline = FederalRegistryPipeline()
-    await pipeline.run_pipeline(days_to_fetch=days_to_fetch)
+    async with FederalRegistryPipeline() as pipeline:
+        await pipeline.run_pipeline(days_to_fetch=days_to_fetch)
 
 def main():
     parser = argparse.ArgumentParser(description='Federal Registry Search System')